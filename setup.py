@@ -18,6 +18,7 @@ tests_require = [
     "pytest-mock",
     "pytest-xdist",
     "pytest-asyncio",
+    "celery",
 ]
 
 setup(
@@ -29,7 +30,11 @@ setup(
     author="G.R Erdtsieck",
     install_requires=install_requires,
     tests_require=tests_require,
-    extras_require={"test": tests_require},
+    extras_require={
+        "test": tests_require,
+        "http2": ["httpx[http2]"],
+        "celery": ["celery"],
+    },
     package_dir={"": "src"},
     packages=find_packages("src"),
     include_package_data=True,
@@ -2,9 +2,11 @@ from django.core.exceptions import ImproperlyConfigured
 from django.utils.module_loading import import_string
 
 from wagtail_facebook_events.settings import (
+    DEAD_LETTER_MODEL,
     EVENT_MODEL,
     EVENT_SERIALIZER,
     IMPORTER,
+    SYNC_CURSOR_MODEL,
 )
 
 
@@ -26,9 +28,34 @@ def get_event_serializer():
         )
 
 
-def get_importer():
+def get_sync_cursor_model():
+    if not SYNC_CURSOR_MODEL:
+        raise ImproperlyConfigured(
+            "Incremental sync requires WAGTAIL_FACEBOOK_EVENTS_SYNC_CURSOR_MODEL."
+        )
+    try:
+        return import_string(SYNC_CURSOR_MODEL)
+    except ImportError:
+        raise ImproperlyConfigured(
+            f"Could not import sync cursor model {SYNC_CURSOR_MODEL}. Is it correct?"
+        )
+
+
+def get_dead_letter_model():
+    """Returns the dead-letter model, or ``None`` if rejects are only logged."""
+    if not DEAD_LETTER_MODEL:
+        return None
+    try:
+        return import_string(DEAD_LETTER_MODEL)
+    except ImportError:
+        raise ImproperlyConfigured(
+            f"Could not import dead-letter model {DEAD_LETTER_MODEL}. Is it correct?"
+        )
+
+
+def get_importer(**kwargs):
     try:
-        return import_string(IMPORTER)()
+        return import_string(IMPORTER)(**kwargs)
     except ImportError:
         raise ImproperlyConfigured(
             f"Could not import importer {IMPORTER}. Is it correct?"
@@ -1,18 +1,88 @@
+import json
+import logging
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlencode
 
+import httpx
+
+from wagtail_facebook_events.api_clients.page_size import AdaptivePageSize
+from wagtail_facebook_events.api_clients.response_cache import GraphResponseCache
+from wagtail_facebook_events.api_clients.throttle import (
+    RATE_LIMIT_ERROR_CODES,
+    GraphThrottle,
+    default_throttle,
+    graph_error_code,
+    is_retryable,
+    is_too_much_data,
+)
+from wagtail_facebook_events.http import HTTPClientPool
 from wagtail_facebook_events.settings import (
     ACCESS_TOKEN,
+    ADAPTIVE_PAGE_SIZE,
     APP_ID,
     APP_SECRET,
+    EVENT_FIELDS,
+    GRAPH_URL,
     PAGE_ID,
+    PAGE_SIZE,
+    RESPONSE_CACHE,
+    RETRY_ATTEMPTS,
 )
 
+logger = logging.getLogger(__name__)
+
+# The Graph API accepts at most 50 requests in a single batch.
+BATCH_LIMIT = 50
+
+
+def fields_query(fields: List[Union[str, Dict[str, list]]]) -> str:
+    """Joins a field projection into the value of Graph's ``fields`` parameter.
+
+    Entries are field names, nested selections such as ``cover{id,source}``,
+    or dicts mapping a field to its own projection, e.g.
+    ``{"place": ["name", {"location": ["city", "zip"]}]}``.
+    """
+    parts = []
+    for field in fields:
+        if isinstance(field, dict):
+            parts.extend(
+                f"{name}{{{fields_query(subfields)}}}"
+                for name, subfields in field.items()
+            )
+        else:
+            parts.append(field)
+    return ",".join(parts)
+
 
 class BaseFacebookAPIClient(ABC):
     access_token = ACCESS_TOKEN
     app_id = APP_ID
     app_secret = APP_SECRET
     page_id = PAGE_ID
+    retry_attempts = RETRY_ATTEMPTS
+    fields = EVENT_FIELDS
+    graph_url = GRAPH_URL
+
+    def __init__(
+        self,
+        http: HTTPClientPool = None,
+        throttle: GraphThrottle = None,
+        response_cache: GraphResponseCache = None,
+        page_id: str = None,
+        access_token: str = None,
+    ):
+        # The page and token default to the PAGE_ID and ACCESS_TOKEN settings.
+        if page_id is not None:
+            self.page_id = page_id
+        if access_token is not None:
+            self.access_token = access_token
+        self.http = http or HTTPClientPool()
+        self.throttle = throttle or default_throttle
+        if response_cache is None and RESPONSE_CACHE:
+            response_cache = GraphResponseCache()
+        self.response_cache = response_cache
+        self.page_size = AdaptivePageSize() if ADAPTIVE_PAGE_SIZE else None
 
     @abstractmethod
     def get():
@@ -21,3 +91,123 @@ class BaseFacebookAPIClient(ABC):
     @abstractmethod
     def fetch_next_page():
         pass
+
+    def events_request(
+        self, page_id: str, fields: List[str] = None, limit: int = 25
+    ) -> str:
+        """Returns the relative batch URL for the events of a page."""
+        query = urlencode(
+            {"fields": fields_query(fields or self.fields), "limit": limit}
+        )
+        return f"{page_id}/events?{query}"
+
+    def event_request(self, event_id: str, fields: List[str] = None) -> str:
+        """Returns the relative batch URL for the details of a single event."""
+        query = urlencode({"fields": fields_query(fields or self.fields)})
+        return f"{event_id}?{query}"
+
+    def _limit(self, limit: Optional[int]) -> int:
+        """Returns ``limit``, or the adaptive page size when it is ``None``."""
+        if limit is not None:
+            return limit
+        return self.page_size.limit if self.page_size else PAGE_SIZE
+
+    def _next_page_url(self, next_url: str) -> str:
+        """Sets the current access token and adaptive page size on a paging URL.
+
+        Paging links replayed from the response cache are stored without
+        the token they were fetched with.
+        """
+        url = httpx.URL(next_url)
+        if self.access_token:
+            url = url.copy_set_param("access_token", self.access_token)
+        return self._with_page_size(str(url))
+
+    def _with_page_size(self, url: str) -> str:
+        """Sets the adaptive page size as the limit of a paging URL."""
+        if self.page_size is None:
+            return url
+        return str(httpx.URL(url).copy_set_param("limit", self.page_size.limit))
+
+    def _observe_page(self, response: httpx.Response):
+        """Feeds the adaptive page size with the time of the successful exchange.
+
+        ``_send`` sets ``response.elapsed`` to that request alone, without
+        the throttle pauses and retry backoffs before it. With a response
+        cache the limit is kept, so every run requests the same pages and
+        finds their validators; it still shrinks when Graph refuses a page.
+        """
+        if self.page_size is not None and self.response_cache is None:
+            self.page_size.observe(
+                response.elapsed.total_seconds(), len(response.content)
+            )
+
+    def _shrink_page_size(self, response: httpx.Response) -> bool:
+        """Shrinks the adaptive page size if Graph refused a page as too large."""
+        return (
+            self.page_size is not None
+            and is_too_much_data(response)
+            and self.page_size.shrink()
+        )
+
+    def _retry_delay(
+        self, attempt: int, response: httpx.Response = None
+    ) -> Optional[float]:
+        """Returns how long to wait before retrying a request, or ``None`` to give up.
+
+        ``response`` is ``None`` when the request failed without one, e.g.
+        on a connection error. A rate limit error pauses every client of the
+        process, not just this one.
+        """
+        if attempt >= self.retry_attempts:
+            return None
+        if response is not None and not is_retryable(response):
+            return None
+        delay = self.throttle.backoff(attempt)
+        error = "connection error" if response is None else response.status_code
+        if (
+            response is not None
+            and graph_error_code(response) in RATE_LIMIT_ERROR_CODES
+        ):
+            self.throttle.pause(delay)
+            error = f"rate limit error {graph_error_code(response)}"
+        logger.warning(
+            f"Graph request failed with {error}; retrying in {delay:.1f} seconds"
+        )
+        return delay
+
+    def _batch_chunks(self, relative_urls: List[str]) -> List[Dict[str, str]]:
+        """Splits the relative URLs into form payloads of one batch each."""
+        return [
+            {
+                "access_token": self.access_token,
+                "include_headers": "false",
+                "batch": json.dumps(
+                    [
+                        {"method": "GET", "relative_url": relative_url}
+                        for relative_url in relative_urls[i : i + BATCH_LIMIT]
+                    ]
+                ),
+            }
+            for i in range(0, len(relative_urls), BATCH_LIMIT)
+        ]
+
+    @staticmethod
+    def _parse_batch_response(responses: List[Optional[Dict[str, Any]]]):
+        """Decodes the body of every response in a batch.
+
+        Graph returns ``null`` for requests that did not complete; those,
+        and requests that failed, are logged and returned as ``None``.
+        """
+        bodies = []
+        for response in responses:
+            if response is None:
+                logger.warning("Batch request did not complete")
+                bodies.append(None)
+                continue
+            body = json.loads(response.get("body") or "null")
+            if response.get("code") != 200:
+                logger.warning(f"Batch request failed: {body}")
+                body = None
+            bodies.append(body)
+        return bodies
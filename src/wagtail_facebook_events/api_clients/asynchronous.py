@@ -1,41 +1,150 @@
-from typing import Any, Dict, List
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 
 import httpx
 
-from wagtail_facebook_events.api_clients import BaseFacebookAPIClient
+from wagtail_facebook_events.api_clients import (
+    BaseFacebookAPIClient,
+    fields_query,
+)
 
 
 class FacebookEventsAPI(BaseFacebookAPIClient):
-    async def get(self, fields: List[str] = None, limit: int = 25) -> Dict[str, Any]:
-        """Asynchronously fetches a list of upcoming events with the specified fields and limit."""
+    async def get(
+        self,
+        fields: List[str] = None,
+        limit: int = None,
+        since: int = None,
+        until: int = None,
+        after: str = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously fetches upcoming events with the given fields and limit.
+
+        ``since`` and ``until`` are unix timestamps passed on as Graph time filters;
+        ``after`` is a paging cursor to start from. Without a ``limit`` the
+        adaptive page size is used.
+        """
         if fields is None:
-            fields = [
-                "name",
-                "description",
-                "date",
-                "start_time",
-                "end_time",
-                "cover",
-                "place",
-                "ticket_uri",
-            ]
-
-        fields_query = ",".join(fields)
-        url = f"https://graph.facebook.com/v20.0/{self.page_id}/events"
+            fields = self.fields
+        url = f"{self.graph_url}/{self.page_id}/events"
         params = {
             "access_token": self.access_token,
-            "fields": fields_query,
-            "limit": limit,
+            "fields": fields_query(fields),
+            "limit": self._limit(limit),
         }
+        if since is not None:
+            params["since"] = since
+        if until is not None:
+            params["until"] = until
+        if after is not None:
+            params["after"] = after
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._request(url, params=params, adaptive=limit is None)
 
     async def fetch_next_page(self, next_url: str) -> Dict[str, Any]:
         """Asynchronously fetches the next page of events."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(next_url)
-            response.raise_for_status()
+        return await self._request(
+            self._next_page_url(next_url), adaptive=self.page_size is not None
+        )
+
+    # The asynchronous importer shares its interface with FakeFacebookEventsAPI.
+    async_get = get
+    async_fetch_next_page = fetch_next_page
+
+    async def batch(self, relative_urls: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Asynchronously performs the GET requests in Graph batch round trips.
+
+        Returns the decoded bodies in the order of ``relative_urls``, with
+        ``None`` for every request that failed.
+        """
+        bodies = []
+        for payload in self._batch_chunks(relative_urls):
+            response = await self._send("POST", f"{self.graph_url}/", data=payload)
+            bodies.extend(self._parse_batch_response(response.json()))
+        return bodies
+
+    async def get_events(
+        self, event_ids: List[str], fields: List[str] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Asynchronously returns the details of every event, keyed by event id."""
+        bodies = await self.batch(
+            [self.event_request(event_id, fields) for event_id in event_ids]
+        )
+        return dict(zip(event_ids, bodies))
+
+    async def get_covers(
+        self, event_ids: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Asynchronously returns the cover of every event, keyed by event id."""
+        events = await self.get_events(event_ids, fields=["cover"])
+        return {
+            event_id: (event or {}).get("cover") for event_id, event in events.items()
+        }
+
+    async def get_pages(
+        self, page_ids: List[str], fields: List[str] = None, limit: int = 25
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Asynchronously returns the first events page of every page, by page id."""
+        bodies = await self.batch(
+            [self.events_request(page_id, fields, limit) for page_id in page_ids]
+        )
+        return dict(zip(page_ids, bodies))
+
+    async def _request(
+        self, url: str, params: Dict[str, Any] = None, adaptive: bool = False
+    ) -> Dict[str, Any]:
+        """Performs a GET request on the pooled client and returns the JSON body.
+
+        For ``adaptive`` listings the page size follows the observed pages,
+        and a page that Graph refuses as too large is requested again with
+        a smaller limit. With a response cache the request is conditional,
+        and the body is returned as a ``GraphPage``.
+        """
+        while True:
+            cache_key, cache_entry, headers = (
+                await self.response_cache.alookup(url, params)
+                if self.response_cache
+                else (None, None, {})
+            )
+            try:
+                response = await self._send("GET", url, params=params, headers=headers)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 304 and cache_entry:
+                    return self.response_cache.page(cache_key, cache_entry, e.response)
+                if not (adaptive and self._shrink_page_size(e.response)):
+                    raise
+                if params:
+                    params = {**params, "limit": self.page_size.limit}
+                else:
+                    url = self._with_page_size(url)
+                continue
+            if adaptive:
+                self._observe_page(response)
+            if self.response_cache:
+                return self.response_cache.page(cache_key, cache_entry, response)
             return response.json()
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends a request within the Graph rate limits, retrying transient failures."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.throttle.delay())
+            start_time = time.monotonic()
+            try:
+                response = await self.http.async_client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                # Times this exchange alone, without the pauses before it.
+                response.elapsed = timedelta(seconds=time.monotonic() - start_time)
+                self.throttle.update(response.headers)
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -1,77 +1,397 @@
+import itertools
+import json
 import random
-from datetime import timedelta
-from typing import Any, Dict, List
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
 
-from asgiref.sync import sync_to_async
-from django.utils import timezone
+import httpx
 from faker import Faker
 
 from wagtail_facebook_events.api_clients import BaseFacebookAPIClient
+from wagtail_facebook_events.settings import GRAPH_URL
 
-fake = Faker()
+# A 1x1 transparent GIF, served for every cover image.
+PIXEL_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04"
+    b"\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+# Graph paths start with the API version, e.g. ``/v20.0/1/events``; any other
+# path is treated as a cover image.
+GRAPH_PATH = re.compile(r"^/v\d+\.\d+/")
+
+
+class FakeEventGenerator:
+    """Generates ``count`` fake events, quickly and reproducibly.
+
+    Names, descriptions and places are drawn from pools that a Faker seeded
+    with ``seed`` fills once, so every event is built without calling Faker
+    and the same seed always yields the same events. Event ``index`` has
+    the facebook_id ``index + 1``, so ids are unique however many events
+    are generated.
+
+    ``change`` edits a share of the events, as if they were changed on
+    Facebook between two imports: they get new text, a new cover and a
+    later ``updated_time``.
+    """
+
+    # In UTC; naive, because formatting naive datetimes is faster.
+    epoch = datetime(2024, 1, 1)
+
+    def __init__(
+        self,
+        count: int = 1000,
+        seed: int = 0,
+        pool_size: int = 500,
+        cover_url: str = "https://images.example.com/covers",
+    ):
+        self.count = count
+        self.seed = seed
+        self.cover_url = cover_url
+        self.run = 0
+        # The run in which each event last changed; 0 if it never did.
+        self.changed_in = [0] * count
+        self.updated_times = {}
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.names = [fake.catch_phrase() for _ in range(pool_size)]
+        self.descriptions = [fake.paragraph() for _ in range(pool_size)]
+        self.venues = [fake.company() for _ in range(pool_size)]
+        self.cities = [fake.city() for _ in range(pool_size)]
+
+    def event(self, index: int) -> Dict[str, Any]:
+        run = self.changed_in[index] if index < self.count else 0
+        pick = (index * 7919 + run * 104729 + self.seed) % len(self.names)
+        start_time = self.epoch + timedelta(hours=index)
+        return {
+            "id": str(index + 1),
+            "name": self.names[pick],
+            "description": self.descriptions[pick],
+            "start_time": _graph_time(start_time),
+            "end_time": _graph_time(start_time + timedelta(hours=2)),
+            "place": {
+                "name": self.venues[index % len(self.venues)],
+                "location": {"city": self.cities[index % len(self.cities)]},
+            },
+            "cover": {
+                "id": f"{index + 1}-{run}",
+                "source": f"{self.cover_url}/{index + 1}-{run}.gif",
+            },
+            "updated_time": self._updated_time(run),
+        }
+
+    def _updated_time(self, run: int) -> str:
+        if run not in self.updated_times:
+            self.updated_times[run] = _graph_time(self.epoch + timedelta(minutes=run))
+        return self.updated_times[run]
+
+    def events(self, offset: int = 0, limit: int = None) -> List[Dict[str, Any]]:
+        stop = self.count if limit is None else min(self.count, offset + limit)
+        return [self.event(index) for index in range(offset, stop)]
+
+    def change(self, rate: float) -> List[str]:
+        """Changes ``rate`` of the events, picked by the seed; returns their ids."""
+        self.run += 1
+        picked = random.Random(f"{self.seed}:{self.run}").sample(
+            range(self.count), round(self.count * rate)
+        )
+        for index in picked:
+            self.changed_in[index] = self.run
+        return [str(index + 1) for index in sorted(picked)]
+
+
+def _graph_time(value: datetime) -> str:
+    return f"{value.isoformat()}+0000"
+
+
+def project(event: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    """Keeps the fields requested in ``params``; nested selections are ignored."""
+    if not params.get("fields"):
+        return event
+    fields = params["fields"]
+    while "{" in fields:
+        fields = re.sub(r"\{[^{}]*\}", "", fields)
+    fields = fields.split(",") + ["id"]
+    return {key: value for key, value in event.items() if key in fields}
+
+
+def events_listing(
+    generator: FakeEventGenerator, url: Union[str, httpx.URL], params: Dict[str, str]
+) -> Dict[str, Any]:
+    """Returns a listing of the generator's events, paged with offset cursors."""
+    limit = int(params.get("limit", 25))
+    offset = int(params.get("after", 0))
+    body = {
+        "data": [project(event, params) for event in generator.events(offset, limit)]
+    }
+    if offset + limit < generator.count:
+        after = str(offset + limit)
+        body["paging"] = {
+            "cursors": {"after": after},
+            "next": str(httpx.URL(url).copy_with(params={**params, "after": after})),
+        }
+    return body
 
 
 class FakeFacebookEventsAPI(BaseFacebookAPIClient):
-    def __init__(self):
-        super().__init__()
-        # Initialize a counter for pagination tracking
-        self.page_counter = 0
+    """Serves the generator's events without making any HTTP requests."""
 
-    def get(self, fields: List[str] = None, limit: int = 25) -> Dict[str, Any]:
-        """Returns a list of fake events with the specified fields and limit."""
-        return generate_fake_events_data_with_next_page(limit, next_page=True)
+    def __init__(self, http=None, generator: FakeEventGenerator = None, **kwargs):
+        super().__init__(http=http, **kwargs)
+        self.generator = generator or FakeEventGenerator()
+
+    def get(
+        self,
+        fields: List[str] = None,
+        limit: int = None,
+        since: int = None,
+        until: int = None,
+        after: str = None,
+    ) -> Dict[str, Any]:
+        params = {"limit": str(self._limit(limit))}
+        if fields:
+            params["fields"] = ",".join(fields)
+        if after:
+            params["after"] = after
+        return events_listing(
+            self.generator, f"{self.graph_url}/{self.page_id}/events", params
+        )
 
     def fetch_next_page(self, next_url: str) -> Dict[str, Any]:
-        """Fetches the next page of fake events, stops after 10 calls."""
-        self.page_counter += 1
-        next_page = self.page_counter < 50
-        return generate_fake_events_data_with_next_page(50, next_page=next_page)
+        url = httpx.URL(next_url)
+        return events_listing(
+            self.generator, url.copy_with(query=None), dict(url.params)
+        )
+
+    async def async_get(self, *args, **kwargs) -> Dict[str, Any]:
+        return self.get(*args, **kwargs)
+
+    async def async_fetch_next_page(self, next_url: str) -> Dict[str, Any]:
+        return self.fetch_next_page(next_url)
+
+
+class FakeGraphTransport(httpx.MockTransport):
+    """Offline stand-in for the Graph API, for use with ``HTTPClientPool``.
+
+    Answers events listings, single event lookups and batch requests with
+    the events of ``generator``, and records every HTTP request it receives
+    in ``requests``. Listings are split into ``pages`` pages of ``limit``
+    events with page number cursors; with ``pages=None`` they hold the
+    generator's ``count`` events with offset cursors, so they can be walked
+    with any limit. Every path outside the Graph API serves a tiny GIF, so
+    covers can be downloaded too.
+    """
+
+    def __init__(self, pages: Optional[int] = 1, generator: FakeEventGenerator = None):
+        super().__init__(self.handle)
+        self.pages = pages
+        self.generator = generator or FakeEventGenerator()
+        self.requests = []
 
-    async def async_get(
-        self, fields: List[str] = None, limit: int = 25
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if not GRAPH_PATH.match(request.url.path):
+            return httpx.Response(
+                200, content=PIXEL_GIF, headers={"Content-Type": "image/gif"}
+            )
+        if request.method == "POST":
+            form = parse_qs(request.content.decode())
+            batch = json.loads(form["batch"][0])
+            return httpx.Response(
+                200, json=[self._batch_response(item) for item in batch]
+            )
+        return httpx.Response(
+            200,
+            json=self.respond(request.url.path, dict(request.url.params), request.url),
+        )
+
+    def respond(
+        self, path: str, params: Dict[str, str], url: httpx.URL = None
     ) -> Dict[str, Any]:
-        """Asynchronously fetches a list of fake events with the specified fields and limit."""
-        return await sync_to_async(generate_fake_events_data_with_next_page)(
-            limit, next_page=True
+        """Returns the fake body for a Graph path such as ``/v20.0/1/events``."""
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0].startswith("v"):
+            parts = parts[1:]
+        url = (url or httpx.URL(f"{GRAPH_URL}/{'/'.join(parts)}")).copy_with(query=None)
+        if parts and parts[-1] == "events":
+            if self.pages is None:
+                return events_listing(self.generator, url, params)
+            return self._events_page(url, params)
+        event_id = parts[0]
+        event = (
+            self.generator.event(int(event_id) - 1)
+            if event_id.isdigit() and int(event_id) > 0
+            else self.generator.event(0)
         )
+        return project({**event, "id": event_id}, params)
 
-    async def async_fetch_next_page(self, next_url: str) -> Dict[str, Any]:
-        """Asynchronously fetches the next page of fake events, stops after 10 calls."""
-        self.page_counter += 1
-        next_page = self.page_counter < 50
-        return await sync_to_async(generate_fake_events_data_with_next_page)(
-            50, next_page=next_page
+    def _events_page(self, url: httpx.URL, params: Dict[str, str]) -> Dict[str, Any]:
+        limit = int(params.get("limit", 25))
+        page = int(params.get("after", 0))
+        body = {
+            "data": [
+                project(self.generator.event(page * limit + index), params)
+                for index in range(limit)
+            ]
+        }
+        if page + 1 < self.pages:
+            body["paging"] = {
+                "cursors": {"after": str(page + 1)},
+                "next": str(url.copy_with(params={**params, "after": str(page + 1)})),
+            }
+        return body
+
+    def _batch_response(self, item: Dict[str, str]) -> Dict[str, Any]:
+        url = urlsplit(item["relative_url"])
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        return {"code": 200, "body": json.dumps(self.respond(url.path, params))}
+
+
+class FakeGraphServer:
+    """Serves a ``FakeGraphTransport`` over real HTTP on localhost.
+
+    Point the API clients at ``graph_url`` to load test the whole import,
+    connection pools included, offline. The covers of the served events
+    point at the server as well. Every response is delayed by ``latency``
+    seconds, or by a random time within a ``(min, max)`` range, and fails
+    with ``error_status`` for a share ``error_rate`` of the requests; both
+    are drawn from a generator seeded with ``seed``.
+
+    The server runs in a background thread between ``start`` and ``stop``,
+    or within a ``with`` block.
+    """
+
+    def __init__(
+        self,
+        transport: FakeGraphTransport = None,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.transport = transport or FakeGraphTransport(pages=None)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.errors = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def graph_url(self) -> str:
+        return f"{self.url}{httpx.URL(GRAPH_URL).path}"
+
+    def start(self):
+        self.transport.generator.cover_url = f"{self.url}/covers"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="fake-graph-server", daemon=True
         )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        with self.random_lock:
+            latency = (
+                self.random.uniform(*self.latency)
+                if isinstance(self.latency, tuple)
+                else self.latency
+            )
+            fail = self.random.random() < self.error_rate
+        if latency:
+            time.sleep(latency)
+        if fail:
+            self.errors += 1
+            return httpx.Response(
+                self.error_status,
+                json={
+                    "error": {
+                        "message": (
+                            "An unexpected error has occurred. "
+                            "Please retry your request later."
+                        ),
+                        "type": "OAuthException",
+                        "code": 2,
+                        "is_transient": True,
+                    }
+                },
+            )
+        return self.transport.handle(request)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._forward()
+
+            def do_POST(self):
+                self._forward()
+
+            def _forward(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = httpx.Request(
+                    self.command,
+                    f"{server.url}{self.path}",
+                    headers=dict(self.headers),
+                    content=self.rfile.read(length),
+                )
+                response = server.respond(request)
+                body = response.content
+                self.send_response(response.status_code)
+                self.send_header(
+                    "Content-Type",
+                    response.headers.get("Content-Type", "application/json"),
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+_default_generator = None
+_sequence = itertools.count()
 
 
 def generate_fake_event_data():
-    """Generate a single fake event data dictionary."""
-    start_time = timezone.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-    end_time = (timezone.now() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
-    event_id = random.randint(1000, 9999)
-    return {
-        "name": fake.name(),
-        "description": fake.sentence(),
-        "start_time": start_time,
-        "end_time": end_time,
-        "place": {"name": fake.company(), "location": {"city": fake.city()}},
-        "cover": {
-            "source": "https://images.unsplash.com/photo-1720048171098-dba33b2c4806?q=80&w=1974&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDF8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D"
-        },
-        "id": str(event_id),
-    }
+    """Generate a single fake event data dictionary, with a new unique id."""
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = FakeEventGenerator(count=0)
+    return _default_generator.event(next(_sequence))
 
 
 def generate_fake_events_data(num_events):
     """Generate a list of fake event data dictionaries."""
     return [generate_fake_event_data() for _ in range(num_events)]
-
-
-def generate_fake_events_data_with_next_page(num_events, next_page=False):
-    """Generate a list of fake event data dictionaries with a next page URL."""
-    if not next_page:
-        return {"data": generate_fake_events_data(num_events)}
-    return {
-        "data": generate_fake_events_data(num_events),
-        "paging": {"next": "next_page_url"},
-    }
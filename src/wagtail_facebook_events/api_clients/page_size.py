@@ -0,0 +1,55 @@
+import logging
+
+from wagtail_facebook_events.settings import (
+    PAGE_SIZE,
+    PAGE_SIZE_MAX,
+    PAGE_SIZE_MIN,
+    PAGE_TARGET_BYTES,
+    PAGE_TARGET_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePageSize:
+    """The ``limit`` of events listings, adapted to the pages received so far.
+
+    The limit doubles while pages arrive in under half of ``target_seconds``
+    and ``target_bytes``, and halves when a page exceeds either target or
+    when Graph refuses a page as too large, staying between ``minimum``
+    and ``maximum``.
+    """
+
+    def __init__(
+        self,
+        initial: int = PAGE_SIZE,
+        minimum: int = PAGE_SIZE_MIN,
+        maximum: int = PAGE_SIZE_MAX,
+        target_seconds: float = PAGE_TARGET_SECONDS,
+        target_bytes: int = PAGE_TARGET_BYTES,
+    ):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+
+    def observe(self, seconds: float, size: int):
+        """Adapts the limit to a page that took ``seconds`` and was ``size`` bytes."""
+        if seconds > self.target_seconds or size > self.target_bytes:
+            self._set(self.limit // 2)
+        elif seconds < self.target_seconds / 2 and size < self.target_bytes / 2:
+            self._set(self.limit * 2)
+
+    def shrink(self) -> bool:
+        """Halves the limit after a refused page; returns whether it could shrink."""
+        if self.limit <= self.minimum:
+            return False
+        self._set(self.limit // 2)
+        return True
+
+    def _set(self, limit: int):
+        limit = max(self.minimum, min(self.maximum, limit))
+        if limit != self.limit:
+            logger.info(f"Changing the events page size from {self.limit} to {limit}")
+            self.limit = limit
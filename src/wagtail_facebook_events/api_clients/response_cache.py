@@ -0,0 +1,131 @@
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import httpx
+from django.core.cache import caches
+
+from wagtail_facebook_events.settings import (
+    RESPONSE_CACHE_ALIAS,
+    RESPONSE_CACHE_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GraphPage(dict):
+    """The body of an events listing, with its state in the response cache.
+
+    ``unchanged`` pages are identical to when they were last imported and
+    need not be processed again. Otherwise ``cache_key`` and
+    ``cache_entry`` are stored once the page has been imported.
+    """
+
+    def __init__(
+        self,
+        body: Dict[str, Any],
+        cache_key: str = None,
+        cache_entry: Dict[str, Any] = None,
+        unchanged: bool = False,
+    ):
+        super().__init__(body)
+        self.cache_key = cache_key
+        self.cache_entry = cache_entry
+        self.unchanged = unchanged
+
+
+class GraphResponseCache:
+    """Validators of the events listings imported before, in Django's cache.
+
+    Every listing URL is stored with its ``ETag``, ``Last-Modified``, body
+    digest and paging links, so a later request can be made conditional
+    and an unchanged page recognised, even by another process.
+    """
+
+    key_prefix = "wagtail_facebook_events:response"
+
+    def __init__(
+        self, alias: str = RESPONSE_CACHE_ALIAS, timeout: int = RESPONSE_CACHE_TIMEOUT
+    ):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def lookup(
+        self, url: str, params: Dict[str, Any] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, str]]:
+        """Returns the cache key, stored entry and conditional headers of a request."""
+        key = self.key(url, params)
+        entry = self.cache.get(key)
+        return key, entry, self._conditional_headers(entry)
+
+    async def alookup(
+        self, url: str, params: Dict[str, Any] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, str]]:
+        key = self.key(url, params)
+        entry = await self.cache.aget(key)
+        return key, entry, self._conditional_headers(entry)
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def page(
+        self, key: str, entry: Optional[Dict[str, Any]], response: httpx.Response
+    ) -> GraphPage:
+        """Wraps a response, marking it unchanged on a 304 or an identical body."""
+        if response.status_code == 304 and entry:
+            logger.info("Events page not modified since it was last imported")
+            return GraphPage({"data": [], "paging": entry["paging"]}, unchanged=True)
+        body = response.json()
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if entry and entry.get("digest") == digest:
+            logger.info("Events page is identical to when it was last imported")
+            return GraphPage(body, unchanged=True)
+        return GraphPage(
+            body,
+            cache_key=key,
+            cache_entry={
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "digest": digest,
+                "paging": self._without_access_token(body.get("paging", {})),
+            },
+        )
+
+    def store_pages(self, pages: Iterable[GraphPage]):
+        """Stores the validators of pages that have been imported."""
+        entries = {page.cache_key: page.cache_entry for page in pages if page.cache_key}
+        if entries:
+            self.cache.set_many(entries, timeout=self.timeout)
+
+    async def astore_pages(self, pages: Iterable[GraphPage]):
+        entries = {page.cache_key: page.cache_entry for page in pages if page.cache_key}
+        if entries:
+            await self.cache.aset_many(entries, timeout=self.timeout)
+
+    @staticmethod
+    def _without_access_token(paging: Dict[str, Any]) -> Dict[str, Any]:
+        """Strips the access token from the paging links, which are stored."""
+        paging = dict(paging)
+        for name in ("previous", "next"):
+            if paging.get(name):
+                paging[name] = str(
+                    httpx.URL(paging[name]).copy_remove_param("access_token")
+                )
+        return paging
+
+    def key(self, url: str, params: Dict[str, Any] = None) -> str:
+        """Keys a request by its URL and parameters, without the access token."""
+        url = httpx.URL(url, params=params) if params else httpx.URL(url)
+        query = sorted(
+            (name, value)
+            for name, value in url.params.multi_items()
+            if name != "access_token"
+        )
+        request = f"{url.copy_with(query=None)}?{query}"
+        return f"{self.key_prefix}:{hashlib.sha1(request.encode()).hexdigest()}"
@@ -1,43 +1,144 @@
-from typing import Any, Dict, List
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 
 import httpx
-import requests
 
-from wagtail_facebook_events.api_clients import BaseFacebookAPIClient
+from wagtail_facebook_events.api_clients import (
+    BaseFacebookAPIClient,
+    fields_query,
+)
 
 
 class FacebookEventsAPI(BaseFacebookAPIClient):
-    def get(self, fields: List[str] = None, limit: int = 25) -> Dict[str, Any]:
-        """Returns a list of upcoming events with the specified fields and limit."""
+    def get(
+        self,
+        fields: List[str] = None,
+        limit: int = None,
+        since: int = None,
+        until: int = None,
+        after: str = None,
+    ) -> Dict[str, Any]:
+        """Returns a list of upcoming events with the specified fields and limit.
+
+        ``since`` and ``until`` are unix timestamps passed on as Graph time filters;
+        ``after`` is a paging cursor to start from. Without a ``limit`` the
+        adaptive page size is used.
+        """
         if fields is None:
-            fields = [
-                "name",
-                "description",
-                "date",
-                "start_time",
-                "end_time",
-                "cover",
-                "place",
-                "ticket_uri",
-            ]
-
-        fields_query = ",".join(fields)
-
-        url = f"https://graph.facebook.com/v20.0/{self.page_id}/events"
+            fields = self.fields
+
+        url = f"{self.graph_url}/{self.page_id}/events"
         params = {
             "access_token": self.access_token,
-            "fields": fields_query,
-            "limit": limit,
+            "fields": fields_query(fields),
+            "limit": self._limit(limit),
         }
+        if since is not None:
+            params["since"] = since
+        if until is not None:
+            params["until"] = until
+        if after is not None:
+            params["after"] = after
 
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        events_page = response.json()
-        return events_page
+        return self._request(url, params=params, adaptive=limit is None)
 
     def fetch_next_page(self, next_url: str) -> Dict[str, Any]:
         """Fetches the next page of events."""
-        response = requests.get(next_url)
-        response.raise_for_status()
-        events_page = response.json()
-        return events_page
+        return self._request(
+            self._next_page_url(next_url), adaptive=self.page_size is not None
+        )
+
+    def batch(self, relative_urls: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Performs the GET requests in as few Graph batch round trips as possible.
+
+        Returns the decoded bodies in the order of ``relative_urls``, with
+        ``None`` for every request that failed.
+        """
+        bodies = []
+        for payload in self._batch_chunks(relative_urls):
+            response = self._send("POST", f"{self.graph_url}/", data=payload)
+            bodies.extend(self._parse_batch_response(response.json()))
+        return bodies
+
+    def get_events(
+        self, event_ids: List[str], fields: List[str] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Returns the details of every event, keyed by event id."""
+        bodies = self.batch(
+            [self.event_request(event_id, fields) for event_id in event_ids]
+        )
+        return dict(zip(event_ids, bodies))
+
+    def get_covers(self, event_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Returns the cover of every event, keyed by event id."""
+        events = self.get_events(event_ids, fields=["cover"])
+        return {
+            event_id: (event or {}).get("cover") for event_id, event in events.items()
+        }
+
+    def get_pages(
+        self, page_ids: List[str], fields: List[str] = None, limit: int = 25
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Returns the first events page of every page, keyed by page id."""
+        bodies = self.batch(
+            [self.events_request(page_id, fields, limit) for page_id in page_ids]
+        )
+        return dict(zip(page_ids, bodies))
+
+    def _request(
+        self, url: str, params: Dict[str, Any] = None, adaptive: bool = False
+    ) -> Dict[str, Any]:
+        """Performs a GET request on the pooled client and returns the JSON body.
+
+        For ``adaptive`` listings the page size follows the observed pages,
+        and a page that Graph refuses as too large is requested again with
+        a smaller limit. With a response cache the request is conditional,
+        and the body is returned as a ``GraphPage``.
+        """
+        while True:
+            cache_key, cache_entry, headers = (
+                self.response_cache.lookup(url, params)
+                if self.response_cache
+                else (None, None, {})
+            )
+            try:
+                response = self._send("GET", url, params=params, headers=headers)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 304 and cache_entry:
+                    return self.response_cache.page(cache_key, cache_entry, e.response)
+                if not (adaptive and self._shrink_page_size(e.response)):
+                    raise
+                if params:
+                    params = {**params, "limit": self.page_size.limit}
+                else:
+                    url = self._with_page_size(url)
+                continue
+            if adaptive:
+                self._observe_page(response)
+            if self.response_cache:
+                return self.response_cache.page(cache_key, cache_entry, response)
+            return response.json()
+
+    def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends a request within the Graph rate limits, retrying transient failures."""
+        attempt = 0
+        while True:
+            time.sleep(self.throttle.delay())
+            start_time = time.monotonic()
+            try:
+                response = self.http.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                # Times this exchange alone, without the pauses before it.
+                response.elapsed = timedelta(seconds=time.monotonic() - start_time)
+                self.throttle.update(response.headers)
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,136 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from wagtail_facebook_events.settings import (
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    THROTTLE_MAX_DELAY,
+    THROTTLE_SLOWDOWN_AT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Graph error codes for the application, user, page and custom rate limits.
+RATE_LIMIT_ERROR_CODES = {4, 17, 32, 613}
+USAGE_HEADERS = ["X-App-Usage", "X-Page-Usage", "X-Business-Use-Case-Usage"]
+
+
+def graph_error_code(response: httpx.Response) -> Optional[int]:
+    """Returns the Graph error code of a failed response, if it has one."""
+    try:
+        return response.json()["error"]["code"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def is_too_much_data(response: httpx.Response) -> bool:
+    """Whether Graph refused a response as too large for the requested limit."""
+    try:
+        error = response.json()["error"]
+    except (ValueError, KeyError, TypeError):
+        return False
+    return error.get("code") == 1 and "reduce the amount of data" in str(
+        error.get("message", "")
+    )
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    """Whether a failed response is worth retrying: rate limits and server errors."""
+    if response.is_success or is_too_much_data(response):
+        return False
+    return (
+        response.status_code == 429
+        or response.status_code >= 500
+        or graph_error_code(response) in RATE_LIMIT_ERROR_CODES
+    )
+
+
+class GraphThrottle:
+    """Rate-limit state of the Graph API, shared by all clients of a process.
+
+    Every response updates the usage from the ``X-App-Usage``,
+    ``X-Page-Usage`` and ``X-Business-Use-Case-Usage`` headers. Once the
+    highest reported percentage passes ``slowdown_at`` every request is
+    delayed, up to ``max_delay`` seconds as usage approaches 100%. A rate
+    limit error, or an ``estimated_time_to_regain_access``, pauses all
+    requests until the limit has been lifted.
+    """
+
+    def __init__(
+        self,
+        slowdown_at: float = THROTTLE_SLOWDOWN_AT,
+        max_delay: float = THROTTLE_MAX_DELAY,
+        backoff_base: float = RETRY_BACKOFF_BASE,
+        backoff_max: float = RETRY_BACKOFF_MAX,
+    ):
+        self.slowdown_at = slowdown_at
+        self.max_delay = max_delay
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.usage = 0.0
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, headers: httpx.Headers):
+        """Records the usage reported in the headers of a Graph response."""
+        usage, regain_access_in = None, 0.0
+        for name in USAGE_HEADERS:
+            if name not in headers:
+                continue
+            try:
+                value = json.loads(headers[name])
+            except ValueError:
+                continue
+            # Business use case usage is a list of usages per business id.
+            if name == "X-Business-Use-Case-Usage":
+                usages = [item for items in value.values() for item in items]
+            else:
+                usages = [value]
+            for item in usages:
+                percentages = [
+                    item.get(key) or 0
+                    for key in ("call_count", "total_cputime", "total_time")
+                ]
+                usage = max([usage or 0.0, *percentages])
+                regain_access_in = max(
+                    regain_access_in,
+                    60.0 * (item.get("estimated_time_to_regain_access") or 0),
+                )
+        if usage is not None:
+            with self._lock:
+                self.usage = usage
+            if usage >= self.slowdown_at:
+                logger.info(f"Graph API usage is at {usage}%; slowing down requests")
+        if regain_access_in:
+            self.pause(regain_access_in)
+
+    def pause(self, seconds: float):
+        """Holds back all requests of the process for ``seconds``."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def delay(self) -> float:
+        """Returns how many seconds to wait before sending the next request."""
+        with self._lock:
+            paused = self.paused_until - time.monotonic()
+            usage = self.usage
+        if paused > 0:
+            return paused
+        if usage < self.slowdown_at:
+            return 0.0
+        pressure = (usage - self.slowdown_at) / max(100 - self.slowdown_at, 1)
+        return self.max_delay * min(pressure, 1.0)
+
+    def backoff(self, attempt: int) -> float:
+        """Returns a full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+# Shared by every client that is not given its own throttle.
+default_throttle = GraphThrottle()
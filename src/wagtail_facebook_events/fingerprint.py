@@ -0,0 +1,50 @@
+import hashlib
+import json
+from typing import Any, Dict, List
+
+from wagtail_facebook_events.settings import HASH_FIELDS
+
+# Fields hashed before fingerprints became canonical, in their original order.
+LEGACY_HASH_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "start_time",
+    "end_time",
+    "place",
+]
+
+
+def fingerprint(event: Dict[str, Any], fields: List[str] = None) -> str:
+    """Returns a stable 32 character digest of the given fields of a Graph event.
+
+    Fields may be dotted paths into nested objects, such as ``cover.id``.
+    The values are serialised as canonical JSON with sorted keys, so the key
+    order of a Graph response never changes the fingerprint.
+    """
+    values = {field: _lookup(event, field) for field in fields or HASH_FIELDS}
+    payload = json.dumps(
+        values, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def legacy_fingerprint(event: Dict[str, Any]) -> str:
+    """Returns the SHA-256 fingerprint that was stored by earlier releases."""
+    hash_string = "".join(
+        f"{key}:{value}" for key, value in event.items() if key in LEGACY_HASH_FIELDS
+    )
+    return hashlib.sha256(hash_string.encode()).hexdigest()
+
+
+def is_legacy_fingerprint(value: str) -> bool:
+    return value is not None and len(value) == 64
+
+
+def _lookup(event: Dict[str, Any], path: str):
+    value = event
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
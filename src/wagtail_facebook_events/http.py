@@ -0,0 +1,72 @@
+import logging
+
+import httpx
+
+from wagtail_facebook_events.settings import (
+    HTTP2,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientPool:
+    """Pooled HTTP clients shared by the API clients and image processors.
+
+    The clients are created on first use and keep their connections alive
+    until the pool is closed, so all requests of an importer run reuse the
+    same TCP and TLS connections.
+    """
+
+    def __init__(self, transport=None, async_transport=None):
+        self.transport = transport
+        self.async_transport = async_transport
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                transport=self.transport, **self._client_options()
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                transport=self.async_transport, **self._client_options()
+            )
+        return self._async_client
+
+    def close(self):
+        """Closes the synchronous client; it is recreated on next use."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            logger.info("Closed pooled HTTP client")
+
+    async def aclose(self):
+        """Closes both clients; they are recreated on next use."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            logger.info("Closed pooled asynchronous HTTP client")
+        self.close()
+
+    @staticmethod
+    def _client_options():
+        return {
+            "limits": httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            "timeout": HTTP_TIMEOUT,
+            "http2": HTTP2,
+            "follow_redirects": True,
+        }
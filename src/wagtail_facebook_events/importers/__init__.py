@@ -1,17 +1,353 @@
 import logging
+import time
 from abc import ABC, abstractmethod
+from datetime import timedelta
 
+from django.utils import timezone
+
+from wagtail_facebook_events import get_sync_cursor_model
+from wagtail_facebook_events.api_clients.response_cache import GraphPage
 from wagtail_facebook_events.api_clients.sync import FacebookEventsAPI
+from wagtail_facebook_events.http import HTTPClientPool
 from wagtail_facebook_events.processors.sync import EventsProcessor
+from wagtail_facebook_events.progress import ImportProgress
+from wagtail_facebook_events.settings import (
+    DB_BATCH_SIZE,
+    FLUSH_BATCH_SIZE,
+    INCREMENTAL_SYNC,
+    INCREMENTAL_SYNC_OVERLAP,
+    SYNC_SHARD_SINCE,
+    SYNC_SHARD_UNTIL,
+    SYNC_SHARDS,
+)
+from wagtail_facebook_events.transformers import parse_graph_datetime
 
 logger = logging.getLogger(__name__)
 
+YEAR = 365 * 24 * 60 * 60
+
 
 class BaseFacebookEventsImporter(ABC):
-    events_api = FacebookEventsAPI()
-    processor = EventsProcessor()
+    events_api_class = FacebookEventsAPI
+    processor_class = EventsProcessor
     full_sync = False
+    # Whether import_events returns a Celery AsyncResult instead of the ids.
+    deferred = False
+
+    def __init__(
+        self,
+        full_sync=False,
+        incremental=INCREMENTAL_SYNC,
+        flush_batch_size=FLUSH_BATCH_SIZE,
+        db_batch_size=DB_BATCH_SIZE,
+        http: HTTPClientPool = None,
+        progress: ImportProgress = None,
+        shards=SYNC_SHARDS,
+        page_id: str = None,
+        access_token: str = None,
+    ):
+        self.full_sync = full_sync
+        self.incremental = incremental
+        self.flush_batch_size = flush_batch_size
+        self.db_batch_size = db_batch_size
+        self.shards = shards
+        self.sync_cursor = None
+        self.progress = progress
+        # A pool passed in by the caller is left open for the caller to close.
+        self._owns_http = http is None
+        self.http = http or HTTPClientPool()
+        self.events_api = self.events_api_class(
+            http=self.http, page_id=page_id, access_token=access_token
+        )
+        self.processor = self.processor_class(
+            http=self.http, page_id=self.events_api.page_id
+        )
+        logger.info(
+            f"Initialized {type(self).__name__} for page {self.events_api.page_id} "
+            f"with full_sync={self.full_sync}, incremental={self.incremental}"
+        )
 
     @abstractmethod
     def import_events(self):
         pass
+
+    def close(self):
+        """Closes the pooled HTTP connections of this importer."""
+        if self._owns_http:
+            self.http.close()
+
+    async def aclose(self):
+        """Closes the pooled HTTP connections of this importer."""
+        if self._owns_http:
+            await self.http.aclose()
+
+    @property
+    def follow_pages(self):
+        return self.full_sync or self.incremental
+
+    @property
+    def sharded(self):
+        return self.follow_pages and self.shards > 1
+
+    def _shard_windows(self, filters):
+        """Splits the synced time range into ``shards`` windows of Graph filters.
+
+        The first and last windows are open-ended, so every event falls in
+        one of them. Events on a boundary can be returned by two windows;
+        ``_unseen_events`` drops the second copy.
+        """
+        now = int(time.time())
+        since = filters.get("since", SYNC_SHARD_SINCE)
+        until = filters.get("until", SYNC_SHARD_UNTIL)
+        lower = since if since is not None else now - 10 * YEAR
+        upper = until if until is not None else now + 2 * YEAR
+        bounds = [
+            lower + (upper - lower) * shard // self.shards
+            for shard in range(1, self.shards)
+        ]
+        windows = []
+        for window_since, window_until in zip([since, *bounds], [*bounds, until]):
+            window = {
+                key: value
+                for key, value in filters.items()
+                if key not in ("since", "until")
+            }
+            if window_since is not None:
+                window["since"] = window_since
+            if window_until is not None:
+                window["until"] = window_until
+            windows.append(window)
+        logger.info(f"Fetching {len(windows)} time windows concurrently")
+        return windows
+
+    def _start_batch(self):
+        self._create_events, self._update_events = [], []
+        self._rehashed_events = []
+        self._imported_ids = []
+        self._rejected_ids = set()
+        self._images_reported = 0
+        self._pending_pages = []
+        self._seen_ids = set()
+
+    def _is_unchanged(self, events_page):
+        """Whether the response cache found the page unchanged since its last import."""
+        if isinstance(events_page, GraphPage) and events_page.unchanged:
+            logger.info("Skipping an events page that has not changed")
+            return True
+        return False
+
+    def _events_to_process(self, events_page):
+        """Returns the part of a fetched page that still has to be processed."""
+        if self.incremental:
+            events_page = self._changed_events(events_page)
+        return self._unseen_events(events_page)
+
+    def _unseen_events(self, events_page):
+        """Drops the events that an earlier page of this run already contained."""
+        events = []
+        for event in events_page.get("data", []):
+            if event.get("id") in self._seen_ids:
+                continue
+            self._seen_ids.add(event.get("id"))
+            events.append(event)
+        if len(events) == len(events_page.get("data", [])):
+            return events_page
+        logger.info(
+            f"Skipping {len(events_page['data']) - len(events)} events already fetched"
+        )
+        return {**events_page, "data": events}
+
+    def _add_page(
+        self, create_events, update_events, rehashed_events=(), events_page=None
+    ):
+        """Queues the changes of a page; returns whether they should be flushed now.
+
+        Without a ``flush_batch_size`` all changes are flushed at the end of
+        the run. Otherwise they are flushed whenever that many are queued,
+        so memory stays flat during a full sync; a size of 1 flushes after
+        every page. How many rows each SQL statement of a flush writes is
+        set separately, by ``db_batch_size``.
+        """
+        self._create_events.extend(create_events)
+        self._update_events.extend(update_events)
+        self._rehashed_events.extend(rehashed_events)
+        if isinstance(events_page, GraphPage):
+            self._pending_pages.append(events_page)
+        queued = (
+            len(self._create_events)
+            + len(self._update_events)
+            + len(self._rehashed_events)
+        )
+        return bool(self.flush_batch_size) and queued >= self.flush_batch_size
+
+    def _flush(self):
+        """Writes the queued changes to the database."""
+        create_events, update_events, rehashed_events = self._take_changes()
+        self.processor.bulk_rehash(rehashed_events, batch_size=self.db_batch_size)
+        if not (create_events or update_events):
+            self._store_pages(set())
+            return
+        if self.processor.upsert_mode:
+            rejected_ids = self.processor.upsert(
+                create_events + [data for data, _ in update_events],
+                batch_size=self.db_batch_size,
+            )
+        else:
+            rejected_ids = self.processor.bulk_create(
+                create_events, batch_size=self.db_batch_size
+            )
+            rejected_ids |= self.processor.bulk_update(
+                update_events, batch_size=self.db_batch_size
+            )
+        imported_ids = self._record_flush(create_events, update_events, rejected_ids)
+        self.processor.resolve_dead_letters(imported_ids)
+        self._store_pages(rejected_ids)
+        if self.progress is not None:
+            self.progress.add(
+                **self._flush_progress(create_events, update_events, rejected_ids)
+            )
+
+    def _take_changes(self):
+        """Returns the queued events to create, update and rehash; empties the queue."""
+        create_events, update_events = self._create_events, self._update_events
+        rehashed_events = self._rehashed_events
+        self._create_events, self._update_events = [], []
+        self._rehashed_events = []
+        if create_events or update_events:
+            logger.info(
+                f"Creating {len(create_events)} events and "
+                f"updating {len(update_events)} events"
+            )
+        return create_events, update_events, rehashed_events
+
+    def _record_flush(self, create_events, update_events, rejected_ids):
+        """Records the outcome of a flush; returns the ids of the stored events."""
+        imported_ids = [
+            event_id
+            for event_id in [event["id"] for event in create_events]
+            + [instance.facebook_id for _, instance in update_events]
+            if event_id not in rejected_ids
+        ]
+        self._imported_ids.extend(imported_ids)
+        self._rejected_ids |= rejected_ids
+        return imported_ids
+
+    @staticmethod
+    def _flush_progress(create_events, update_events, rejected_ids):
+        return {
+            "events_created": len(
+                [event for event in create_events if event["id"] not in rejected_ids]
+            ),
+            "events_updated": len(
+                [
+                    instance
+                    for _, instance in update_events
+                    if instance.facebook_id not in rejected_ids
+                ]
+            ),
+            "events_rejected": len(rejected_ids),
+        }
+
+    def _store_pages(self, rejected_ids):
+        """Records the flushed pages in the response cache, to skip them if unchanged.
+
+        Pages with rejected events are left out, so those are retried.
+        """
+        response_cache = getattr(self.events_api, "response_cache", None)
+        pages = self._pages_to_store(rejected_ids)
+        if response_cache is not None:
+            response_cache.store_pages(pages)
+
+    def _pages_to_store(self, rejected_ids):
+        pages, self._pending_pages = self._pending_pages, []
+        return [
+            page
+            for page in pages
+            if not rejected_ids & {event.get("id") for event in page.get("data", [])}
+        ]
+
+    def _page_progress(self):
+        """Returns the progress counters of the page that was just processed."""
+        images_downloaded = self.processor.images_downloaded
+        counts = {
+            "pages_fetched": 1,
+            "images_downloaded": images_downloaded - self._images_reported,
+        }
+        self._images_reported = images_downloaded
+        return counts
+
+    def _start_incremental_sync(self):
+        """Loads the sync cursor of the page; returns the Graph filters of this run."""
+        SyncCursor = get_sync_cursor_model()
+        self.sync_cursor, _ = SyncCursor.objects.get_or_create(
+            page_id=self.events_api.page_id
+        )
+        self._run_started_at = timezone.now()
+        # The updated_time of every changed event of this run, by facebook_id.
+        self._updated_times = {}
+        if self.sync_cursor.last_run_at is None:
+            logger.info("No previous sync found; fetching all pages")
+            return {}
+        since = self.sync_cursor.last_run_at - timedelta(
+            seconds=INCREMENTAL_SYNC_OVERLAP
+        )
+        logger.info(f"Fetching events changed since {since.isoformat()}")
+        return {"since": int(since.timestamp())}
+
+    def _changed_events(self, events_page):
+        """Drops the events that were not updated since the last sync from the page."""
+        last_updated_time = self.sync_cursor.last_updated_time
+        changed_events = []
+        for event in events_page.get("data", []):
+            updated_time = parse_graph_datetime(event.get("updated_time"))
+            if updated_time is None:
+                changed_events.append(event)
+                continue
+            if last_updated_time and updated_time <= last_updated_time:
+                continue
+            changed_events.append(event)
+            self._updated_times[event.get("id")] = updated_time
+        logger.info(
+            f"{len(changed_events)} of {len(events_page.get('data', []))} events "
+            "changed since the last sync"
+        )
+        return {**events_page, "data": changed_events}
+
+    def _finish_incremental_sync(self):
+        """Advances the sync cursor once all changes of this run are stored."""
+        advance_sync_cursor(
+            self.sync_cursor,
+            self._run_started_at,
+            [
+                updated_time
+                for event_id, updated_time in self._updated_times.items()
+                if event_id not in self._rejected_ids
+            ],
+            [self._updated_times.get(event_id) for event_id in self._rejected_ids],
+        )
+
+
+def advance_sync_cursor(sync_cursor, run_started_at, updated_times, rejected_times):
+    """Moves the sync cursor of a page past a run whose changes are stored.
+
+    ``updated_times`` are those of the stored events. The cursor never moves
+    past the oldest rejected event, so that event is fetched and processed
+    again on the next incremental import.
+    """
+    updated_times = [updated_time for updated_time in updated_times if updated_time]
+    if sync_cursor.last_updated_time:
+        updated_times.append(sync_cursor.last_updated_time)
+    last_updated_time = max(updated_times) if updated_times else None
+    rejected_times = [updated_time for updated_time in rejected_times if updated_time]
+    if rejected_times:
+        oldest_rejected = min(rejected_times)
+        logger.info(
+            f"Keeping the sync cursor before {oldest_rejected.isoformat()} "
+            "so rejected events are retried"
+        )
+        run_started_at = min(run_started_at, oldest_rejected)
+        if last_updated_time and last_updated_time >= oldest_rejected:
+            last_updated_time = oldest_rejected - timedelta(microseconds=1)
+    sync_cursor.last_run_at = run_started_at
+    sync_cursor.last_updated_time = last_updated_time
+    sync_cursor.save(update_fields=["last_run_at", "last_updated_time"])
@@ -4,62 +4,173 @@ import time
 
 from asgiref.sync import sync_to_async
 
+from wagtail_facebook_events.api_clients.asynchronous import FacebookEventsAPI
 from wagtail_facebook_events.importers import BaseFacebookEventsImporter
 from wagtail_facebook_events.processors.asynchronous import (
     AsyncEventsProcessor,
 )
+from wagtail_facebook_events.settings import PREFETCH_DEPTH
 
 logger = logging.getLogger(__name__)
 
 
 class FacebookEventsImporterAsync(BaseFacebookEventsImporter):
-    def __init__(self, full_sync=False):
-        self.full_sync = full_sync
-        self.processor = AsyncEventsProcessor()
-        logger.info(
-            f"Initialized FacebookEventsImporterBase with full_sync={self.full_sync}"
-        )
+    """Fetches pages ahead of processing them, in a separate task.
+
+    The fetch task follows the paging cursors as soon as each page arrives
+    and keeps up to ``prefetch_depth`` pages ready in a bounded queue; a
+    sharded sync runs one fetch task per time window. After
+    every run ``stats`` holds the seconds spent fetching and processing, and
+    waiting for each other: ``process_wait_seconds`` means fetching is the
+    bottleneck, ``fetch_wait_seconds`` (a full queue) means processing is.
+
+    Pages are read and written through the processor's asynchronous ORM
+    methods, so database work takes a few executor hops per page rather
+    than one per event.
+    """
+
+    events_api_class = FacebookEventsAPI
+    processor_class = AsyncEventsProcessor
+
+    def __init__(self, *args, prefetch_depth=PREFETCH_DEPTH, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefetch_depth = max(1, prefetch_depth)
+        self.stats = {}
 
     async def import_events(self):
+        try:
+            return await self._import_events()
+        finally:
+            await self.aclose()
+
+    async def _import_events(self):
         logger.info("Starting asynchronous event import")
         start_time = time.time()
-        events_page = await self.events_api.async_get()
-        create_events, update_events = [], []
-        if self.full_sync:
-            logger.info("Full sync enabled; fetching all pages")
+        filters = (
+            await sync_to_async(self._start_incremental_sync)()
+            if self.incremental
+            else {}
+        )
+        self._start_batch()
+        self.stats = dict.fromkeys(
+            [
+                "pages",
+                "fetch_seconds",
+                "fetch_wait_seconds",
+                "process_seconds",
+                "process_wait_seconds",
+            ],
+            0,
+        )
+        if self.follow_pages:
+            logger.info("Fetching all pages")
+
+        # A sharded sync follows the cursors of every time window concurrently.
+        windows = self._shard_windows(filters) if self.sharded else [filters]
+        pages = asyncio.Queue(maxsize=self.prefetch_depth * len(windows))
+        fetch_tasks = [
+            asyncio.create_task(self._fetch_pages(pages, window)) for window in windows
+        ]
+        try:
+            remaining = len(fetch_tasks)
+            while remaining:
+                wait_start = time.monotonic()
+                events_page = await pages.get()
+                self.stats["process_wait_seconds"] += time.monotonic() - wait_start
+                if isinstance(events_page, Exception):
+                    raise events_page
+                if events_page is None:
+                    remaining -= 1
+                    continue
+                await self._process_page(events_page)
+        finally:
+            for fetch_task in fetch_tasks:
+                fetch_task.cancel()
+            await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        await self._aflush()
+
+        if self.incremental:
+            await sync_to_async(self._finish_incremental_sync)()
+        logger.info(
+            f"Asynchronous import finished in {time.time() - start_time:.2f} seconds"
+        )
+        logger.info(
+            f"Fetched {self.stats['pages']} pages "
+            f"in {self.stats['fetch_seconds']:.2f}s and processed them "
+            f"in {self.stats['process_seconds']:.2f}s; processing "
+            f"waited {self.stats['process_wait_seconds']:.2f}s for pages, fetching "
+            f"waited {self.stats['fetch_wait_seconds']:.2f}s on a full queue"
+        )
+        return self._imported_ids
+
+    async def _fetch_pages(self, pages, filters):
+        """Follows the paging cursors, putting every page on the ``pages`` queue.
+
+        The queue ends with ``None``, or with the exception that stopped the fetching.
+        """
+        try:
+            fetch_start = time.monotonic()
+            events_page = await self.events_api.async_get(**filters)
             while events_page:
+                self.stats["fetch_seconds"] += time.monotonic() - fetch_start
+                wait_start = time.monotonic()
+                await pages.put(events_page)
+                self.stats["fetch_wait_seconds"] += time.monotonic() - wait_start
+                self.stats["pages"] += 1
+
                 next_url = events_page.get("paging", {}).get("next")
-                next_page_task = (
-                    asyncio.create_task(self.events_api.async_fetch_next_page(next_url))
-                    if next_url
-                    else None
-                )
-
-                (
-                    new_create_events,
-                    new_update_events,
-                ) = await self.processor.process_page(events_page)
-                create_events.extend(new_create_events)
-                update_events.extend(new_update_events)
-
-                events_page = await next_page_task if next_page_task else None
-            logger.info(
-                f"Creating {len(create_events)} events and updating {len(update_events)} events"
+                if not (self.follow_pages and next_url):
+                    break
+                logger.info(f"Fetching next page from URL: {next_url}")
+                fetch_start = time.monotonic()
+                events_page = await self.events_api.async_fetch_next_page(next_url)
+        except Exception as e:
+            await pages.put(e)
+        else:
+            await pages.put(None)
+
+    async def _process_page(self, events_page):
+        process_start = time.monotonic()
+        if not self._is_unchanged(events_page) and self._add_page(
+            *await self.processor.process_page(self._events_to_process(events_page)),
+            events_page=events_page,
+        ):
+            await self._aflush()
+        if self.progress is not None:
+            await self.progress.aadd(**self._page_progress())
+        self.stats["process_seconds"] += time.monotonic() - process_start
+
+    async def _aflush(self):
+        """Writes the queued changes to the database with the asynchronous ORM."""
+        create_events, update_events, rehashed_events = self._take_changes()
+        await self.processor.abulk_rehash(
+            rehashed_events, batch_size=self.db_batch_size
+        )
+        if not (create_events or update_events):
+            await self._astore_pages(set())
+            return
+        if self.processor.upsert_mode:
+            rejected_ids = await self.processor.aupsert(
+                create_events + [data for data, _ in update_events],
+                batch_size=self.db_batch_size,
             )
         else:
-            new_create_events, new_update_events = await self.processor.process_page(
-                events_page
+            rejected_ids = await self.processor.abulk_create(
+                create_events, batch_size=self.db_batch_size
             )
-            create_events.extend(new_create_events)
-            update_events.extend(new_update_events)
-            logger.info(
-                f"Creating {len(create_events)} events and updating {len(update_events)} events"
+            rejected_ids |= await self.processor.abulk_update(
+                update_events, batch_size=self.db_batch_size
             )
-        await sync_to_async(self.processor.bulk_create)(create_events)
-        await sync_to_async(self.processor.bulk_update)(update_events)
-        logger.info(
-            f"Asynchronous import finished in {time.time() - start_time:.2f} seconds"
-        )
-        return [event["id"] for event in create_events] + [
-            event[1].facebook_id for event in update_events
-        ]
+        imported_ids = self._record_flush(create_events, update_events, rejected_ids)
+        await self.processor.aresolve_dead_letters(imported_ids)
+        await self._astore_pages(rejected_ids)
+        if self.progress is not None:
+            await self.progress.aadd(
+                **self._flush_progress(create_events, update_events, rejected_ids)
+            )
+
+    async def _astore_pages(self, rejected_ids):
+        response_cache = getattr(self.events_api, "response_cache", None)
+        pages = self._pages_to_store(rejected_ids)
+        if response_cache is not None:
+            await response_cache.astore_pages(pages)
@@ -1,79 +1,203 @@
-import asyncio
 import logging
 import time
 
-from celery import shared_task
+from asgiref.sync import sync_to_async
+from celery import chord, shared_task
 
-from wagtail_facebook_events.importers.asynchronous import (
-    FacebookEventsImporterAsync,
-)
-from wagtail_facebook_events.processors.asynchronous import (
-    AsyncEventsProcessor,
+from wagtail_facebook_events import get_sync_cursor_model
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers import (
+    BaseFacebookEventsImporter,
+    advance_sync_cursor,
 )
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+from wagtail_facebook_events.pages import PageRegistry
+from wagtail_facebook_events.progress import ImportProgress
+from wagtail_facebook_events.service import FacebookEventsImporterService
+from wagtail_facebook_events.settings import CELERY_DB_BATCH_SIZE, CELERY_PAGE_SIZE
+from wagtail_facebook_events.transformers import parse_graph_datetime
 
 logger = logging.getLogger(__name__)
 
 
-class CeleryFacebookEventsImporterAsync(FacebookEventsImporterAsync):
-    # WIP
+class CeleryFacebookEventsImporter(BaseFacebookEventsImporter):
+    """Imports the pages of events in parallel Celery workers.
 
-    async def import_events(self):
-        logger.info("Starting asynchronous event import with Celery")
-        start_time = time.time()
-        events_page = await self.events_api.async_get()
-
-        # List to store async task results for each page
-        tasks = []
-
-        if self.full_sync:
-            logger.info("Full sync enabled; fetching all pages")
-            while events_page:
-                # Add a task to Celery for processing the current page
-                task = process_page_task.delay(events_page)
-                tasks.append(task)
-
-                # Fetch the next page asynchronously
-                next_url = events_page.get("paging", {}).get("next")
-                events_page = (
-                    await self.events_api.async_fetch_next_page(next_url)
-                    if next_url
-                    else None
-                )
-        else:
-            # Process a single page if full sync is not enabled
-            task = process_page_task.delay(events_page)
-            tasks.append(task)
-
-        # Collect all results once tasks are done
-        create_events_ids, update_events_ids = [], []
-        for task in tasks:
-            result = task.get()  # Retrieve task result
-            create_events_ids.extend(result.get("created", []))
-            update_events_ids.extend(result.get("updated", []))
+    The importer only walks the events listing for its paging cursors,
+    requesting nothing but event ids, and sends every worker a cursor
+    instead of a page of events. Workers fetch, process and store their
+    page with ``worker_batch_size`` rows per bulk write, and a chord
+    callback aggregates their results.
 
-        logger.info(
-            f"Finished asynchronous import with Celery in {time.time() - start_time:.2f} seconds"
+    ``import_events`` returns the ``AsyncResult`` of that callback without
+    waiting for it; its value is a dict with the ``imported`` and
+    ``rejected`` facebook_ids. With a ``progress`` the workers add their
+    counts to it.
+    """
+
+    deferred = True
+
+    def __init__(
+        self,
+        *args,
+        page_size=CELERY_PAGE_SIZE,
+        worker_batch_size=CELERY_DB_BATCH_SIZE,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.page_size = page_size
+        self.worker_batch_size = worker_batch_size
+
+    def import_events(self):
+        try:
+            return self._import_events()
+        finally:
+            self.close()
+
+    def _import_events(self):
+        logger.info("Starting event import with Celery")
+        start_time = time.time()
+        filters = self._start_incremental_sync() if self.incremental else {}
+        cursors = self._page_cursors(filters) if self.follow_pages else [None]
+
+        header = [
+            import_page_task.s(
+                page_id=self.events_api.page_id,
+                after=cursor,
+                limit=self.page_size,
+                batch_size=self.worker_batch_size,
+                track_progress=self.progress is not None,
+                **filters,
+            )
+            for cursor in cursors
+        ]
+        callback = aggregate_import_results.s(
+            start_time=start_time,
+            page_id=self.events_api.page_id if self.incremental else None,
+            run_started_at=(
+                self._run_started_at.isoformat() if self.incremental else None
+            ),
         )
+        logger.info(f"Dispatched {len(header)} pages to Celery workers")
+        return chord(header)(callback)
+
+    def _page_cursors(self, filters):
+        """Walks the events listing and returns the ``after`` cursor of every page."""
+        cursors = [None]
+        events_page = self.events_api.get(
+            fields=["id"], limit=self.page_size, **filters
+        )
+        # Every page is requested with the same limit as the workers will use,
+        # so the cursors mark the same page boundaries.
+        while events_page.get("paging", {}).get("next"):
+            cursors.append(events_page["paging"]["cursors"]["after"])
+            events_page = self.events_api.get(
+                fields=["id"], limit=self.page_size, after=cursors[-1], **filters
+            )
+        return cursors
+
 
-        return create_events_ids + update_events_ids
+class CeleryFacebookEventsImporterAsync(CeleryFacebookEventsImporter):
+    """``CeleryFacebookEventsImporter`` for callers that await ``import_events``."""
+
+    async def import_events(self):
+        return await sync_to_async(super().import_events)()
 
 
 @shared_task
-def process_page_task(events_page):
-    # WIP
+def import_page_task(
+    page_id=None,
+    after=None,
+    batch_size=CELERY_DB_BATCH_SIZE,
+    track_progress=False,
+    **filters,
+):
+    """Fetches, processes and stores the events page that starts at ``after``.
+
+    The access token of the page is looked up in the worker's page registry,
+    so it is never sent through the broker. With ``track_progress`` the
+    counts of the page are added to the shared ``ImportProgress``.
     """
-    Celery task to process a single page of events.
-    """
-    processor = AsyncEventsProcessor()  # Use the async processor
-    new_create_events, new_update_events = asyncio.run(
-        processor.process_page(events_page)
+    page = PageRegistry().get(page_id) or {}
+    importer = FacebookEventsImporterSync(
+        db_batch_size=batch_size,
+        http=HTTPClientPool(),
+        progress=ImportProgress() if track_progress else None,
+        page_id=page_id,
+        access_token=page.get("access_token"),
     )
-
-    # Bulk create and update within the task
-    processor.bulk_create(new_create_events)
-    processor.bulk_update(new_update_events)
-
+    try:
+        events_page = importer.import_page(after=after, **filters)
+    finally:
+        importer.http.close()
+
+    updated_times = {
+        event.get("id"): parse_graph_datetime(event.get("updated_time"))
+        for event in events_page.get("data", [])
+    }
+    # The cursor may only move past stored events, and not past rejected ones.
+    imported_times = [
+        updated_times[event_id]
+        for event_id in importer._imported_ids
+        if updated_times.get(event_id)
+    ]
+    rejected_times = [
+        updated_times[event_id]
+        for event_id in importer._rejected_ids
+        if updated_times.get(event_id)
+    ]
     return {
-        "created": [event["id"] for event in new_create_events],
-        "updated": [event[1].facebook_id for event in new_update_events],
+        "imported": importer._imported_ids,
+        "rejected": sorted(importer._rejected_ids),
+        "updated_time": max(imported_times).isoformat() if imported_times else None,
+        "rejected_updated_time": (
+            min(rejected_times).isoformat() if rejected_times else None
+        ),
     }
+
+
+@shared_task
+def aggregate_import_results(
+    results, start_time=None, page_id=None, run_started_at=None
+):
+    """Chord callback: merges the page results and advances the sync cursor."""
+    imported_ids, rejected_ids = [], []
+    for result in results:
+        imported_ids.extend(result["imported"])
+        rejected_ids.extend(result["rejected"])
+
+    if page_id is not None:
+        _finish_incremental_sync(page_id, run_started_at, results)
+    if start_time is not None:
+        logger.info(
+            f"Celery import of {len(results)} pages finished "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+    logger.info(
+        f"Imported {len(imported_ids)} events and rejected {len(rejected_ids)} events"
+    )
+    return {"imported": imported_ids, "rejected": rejected_ids}
+
+
+def _finish_incremental_sync(page_id, run_started_at, results):
+    SyncCursor = get_sync_cursor_model()
+    sync_cursor, _ = SyncCursor.objects.get_or_create(page_id=page_id)
+    advance_sync_cursor(
+        sync_cursor,
+        parse_graph_datetime(run_started_at),
+        [parse_graph_datetime(result["updated_time"]) for result in results],
+        [
+            parse_graph_datetime(result.get("rejected_updated_time"))
+            for result in results
+        ],
+    )
+
+
+@shared_task
+def import_due_pages_task():
+    """Imports every registered page whose interval has passed; run it periodically.
+
+    Returns the result of every page, or the id of its chord when the Celery
+    importer is configured.
+    """
+    return FacebookEventsImporterService().import_pages()
@@ -1,5 +1,8 @@
 import logging
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from wagtail_facebook_events.importers import BaseFacebookEventsImporter
 
@@ -7,49 +10,111 @@ logger = logging.getLogger(__name__)
 
 
 class FacebookEventsImporterSync(BaseFacebookEventsImporter):
-    def __init__(self, full_sync=False):
-        self.full_sync = full_sync
-        logger.info(
-            f"Initialized FacebookEventsImporterBase with full_sync={self.full_sync}"
-        )
-
     def import_events(self):
+        try:
+            return self._import_events()
+        finally:
+            self.close()
+
+    def _import_events(self):
         logger.info("Starting synchronous event import")
         start_time = time.time()
-        events_page = self.events_api.get()
-        create_events, update_events = [], []
+        filters = self._start_incremental_sync() if self.incremental else {}
+        self._start_batch()
 
-        if self.full_sync:
-            logger.info("Full sync enabled; fetching all pages")
+        if self.sharded:
+            self._import_windows(self._shard_windows(filters))
+        else:
+            events_page = self.events_api.get(**filters)
+            if self.follow_pages:
+                logger.info("Fetching all pages")
             while events_page:
-                new_create_events, new_update_events = self.processor.process_page(
-                    events_page
-                )
-                create_events.extend(new_create_events)
-                update_events.extend(new_update_events)
+                self._process_page(events_page)
                 next_url = events_page.get("paging", {}).get("next")
-                if next_url:
-                    logger.info(f"Fetching next page from URL: {next_url}")
-                    events_page = self.events_api.fetch_next_page(next_url)
-                else:
+                if not (self.follow_pages and next_url):
                     break
-            logger.info(
-                f"Creating {len(create_events)} events and updating {len(update_events)} events"
-            )
-        else:
-            new_create_events, new_update_events = self.processor.process_page(
-                events_page
-            )
-            create_events.extend(new_create_events)
-            update_events.extend(new_update_events)
-            logger.info(
-                f"Creating {len(create_events)} events and updating {len(update_events)} events"
-            )
-        self.processor.bulk_create(create_events)
-        self.processor.bulk_update(update_events)
+                logger.info(f"Fetching next page from URL: {next_url}")
+                events_page = self.events_api.fetch_next_page(next_url)
+        self._flush()
+
+        if self.incremental:
+            self._finish_incremental_sync()
         logger.info(
             f"Synchronous import finished in {time.time() - start_time:.2f} seconds"
         )
-        return [event["id"] for event in create_events] + [
-            event[1].facebook_id for event in update_events
-        ]
+        return self._imported_ids
+
+    def import_page(self, **filters):
+        """Imports the single events page selected by the Graph ``filters``.
+
+        Used by the Celery workers, which are handed a page cursor each.
+        """
+        events_page = self.events_api.get(**filters)
+        self._start_batch()
+        if not self._is_unchanged(events_page):
+            self._add_page(
+                *self.processor.process_page(events_page), events_page=events_page
+            )
+            self._flush()
+        if self.progress is not None:
+            self.progress.add(**self._page_progress())
+        return events_page
+
+    def _process_page(self, events_page):
+        if not self._is_unchanged(events_page) and self._add_page(
+            *self.processor.process_page(self._events_to_process(events_page)),
+            events_page=events_page,
+        ):
+            self._flush()
+        if self.progress is not None:
+            self.progress.add(**self._page_progress())
+
+    def _import_windows(self, windows):
+        """Follows the cursors of every window in a thread pool.
+
+        Only the HTTP requests run in the pool; the pages are processed on
+        the calling thread as they arrive, so all ORM writes stay on its
+        database connection.
+        """
+        pages = queue.Queue(maxsize=len(windows))
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(windows)) as executor:
+            for window in windows:
+                executor.submit(self._fetch_window, window, pages, stop)
+            try:
+                remaining = len(windows)
+                while remaining:
+                    events_page = pages.get()
+                    if events_page is None:
+                        remaining -= 1
+                    elif isinstance(events_page, Exception):
+                        raise events_page
+                    else:
+                        self._process_page(events_page)
+            finally:
+                stop.set()
+
+    def _fetch_window(self, filters, pages, stop):
+        """Puts the pages of a window on ``pages``, then ``None``; runs in the pool."""
+        try:
+            events_page = self.events_api.get(**filters)
+            while events_page and self._put(pages, events_page, stop):
+                next_url = events_page.get("paging", {}).get("next")
+                if not next_url:
+                    break
+                events_page = self.events_api.fetch_next_page(next_url)
+        except Exception as e:
+            self._put(pages, e, stop)
+        finally:
+            self._put(pages, None, stop)
+
+    @staticmethod
+    def _put(pages, item, stop):
+        """Waits for room on the queue; returns ``False`` once the import stopped."""
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -1,8 +1,27 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from wagtail.fields import RichTextField
 
 
+# Indexes and constraints of FacebookEvent. Concrete event models inherit
+# them; a model that declares its own Meta should subclass FacebookEvent.Meta
+# so that makemigrations keeps them. Index names are generated per model.
+EVENT_INDEXES = [
+    # Public listings order events by date and start time.
+    models.Index(fields=["date", "start_time"]),
+    # Listings of a single venue when several pages are imported.
+    models.Index(fields=["source_page_id", "date", "start_time"]),
+]
+EVENT_CONSTRAINTS = [
+    # The importer looks events up by facebook_id, and upserts on it.
+    models.UniqueConstraint(
+        fields=["facebook_id"],
+        name="%(app_label)s_%(class)s_unique_facebook_id",
+    ),
+]
+
+
 class FacebookEvent(models.Model):
     """FacebookEvent model."""
 
@@ -20,6 +39,12 @@ class FacebookEvent(models.Model):
             "Check this if you no longer want this FacebookEvent to update from Facebook."
         ),
     )
+    source_page_id = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text=_("ID of the Facebook page the FacebookEvent was imported from"),
+    )
     name = models.CharField(
         max_length=255,
         blank=False,
@@ -102,3 +127,59 @@ class FacebookEvent(models.Model):
         ordering = ["-date"]
         verbose_name = _("FacebookEvent")
         abstract = True
+        indexes = EVENT_INDEXES
+        constraints = EVENT_CONSTRAINTS
+
+
+class FacebookSyncCursor(models.Model):
+    """High-water mark of the incremental sync of a Facebook page."""
+
+    page_id = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text=_("ID of the synced Facebook page"),
+    )
+    last_run_at = models.DateTimeField(
+        blank=True, null=True, help_text=_("Start of the last completed sync")
+    )
+    last_updated_time = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text=_("Latest updated_time of an event seen during a sync"),
+    )
+
+    def __str__(self):
+        return self.page_id
+
+    class Meta:
+        verbose_name = _("FacebookSyncCursor")
+        abstract = True
+
+
+class FacebookDeadLetter(models.Model):
+    """A Facebook event that was rejected during an import, with its errors."""
+
+    facebook_id = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text=_("ID of the rejected FacebookEvent"),
+    )
+    stage = models.CharField(
+        max_length=32, help_text=_("Import step that rejected the event")
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder, help_text=_("Event data as received from Facebook")
+    )
+    errors = models.JSONField(
+        encoder=DjangoJSONEncoder, help_text=_("Validation errors per field")
+    )
+    failed_at = models.DateTimeField(
+        auto_now=True, help_text=_("Time of the latest rejection")
+    )
+
+    def __str__(self):
+        return self.facebook_id
+
+    class Meta:
+        verbose_name = _("FacebookDeadLetter")
+        abstract = True
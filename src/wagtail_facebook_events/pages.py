@@ -0,0 +1,66 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import caches
+
+from wagtail_facebook_events.settings import (
+    ACCESS_TOKEN,
+    IMPORT_CACHE_ALIAS,
+    IMPORT_LOCK_TIMEOUT,
+    PAGE_ID,
+    PAGE_IMPORT_INTERVAL,
+    PAGES,
+)
+
+
+class PageRegistry:
+    """The Facebook pages to import, each with its own token and schedule.
+
+    Pages come from the ``PAGES`` setting, or are the single ``PAGE_ID``.
+    The time of every page's last import and a lock per page are kept in
+    Django's cache, so every process agrees on which pages are due.
+    """
+
+    key_prefix = "wagtail_facebook_events:page"
+
+    def __init__(
+        self, pages: List[Dict[str, Any]] = None, alias: str = IMPORT_CACHE_ALIAS
+    ):
+        pages = PAGES if pages is None else pages
+        if not pages:
+            pages = [{"page_id": PAGE_ID, "access_token": ACCESS_TOKEN}]
+        self.pages = [{"interval": PAGE_IMPORT_INTERVAL, **page} for page in pages]
+        self.cache = caches[alias]
+
+    def get(self, page_id: str) -> Optional[Dict[str, Any]]:
+        return next((page for page in self.pages if page["page_id"] == page_id), None)
+
+    def due(self, now: float = None) -> List[Dict[str, Any]]:
+        """Returns the pages whose interval has passed since their last import."""
+        now = now or time.time()
+        last_imports = self.cache.get_many(
+            [self._key(page["page_id"], "imported_at") for page in self.pages]
+        )
+        return [
+            page
+            for page in self.pages
+            if now - last_imports.get(self._key(page["page_id"], "imported_at"), 0)
+            >= page["interval"]
+        ]
+
+    def acquire(self, page_id: str) -> bool:
+        """Takes the lock of a page; returns ``False`` if it is being imported."""
+        return self.cache.add(
+            self._key(page_id, "lock"), True, timeout=IMPORT_LOCK_TIMEOUT
+        )
+
+    def release(self, page_id: str):
+        self.cache.delete(self._key(page_id, "lock"))
+
+    def mark_imported(self, page_id: str, now: float = None):
+        self.cache.set(
+            self._key(page_id, "imported_at"), now or time.time(), timeout=None
+        )
+
+    def _key(self, page_id: str, name: str) -> str:
+        return f"{self.key_prefix}:{page_id}:{name}"
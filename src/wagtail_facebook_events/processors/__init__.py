@@ -1,100 +1,400 @@
-import hashlib
 import logging
 import time
 from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
 from wagtail.images import get_image_model
 
-from wagtail_facebook_events import get_event_model, get_event_serializer
+from wagtail_facebook_events import (
+    get_dead_letter_model,
+    get_event_model,
+    get_event_serializer,
+)
+from wagtail_facebook_events.fingerprint import (
+    fingerprint,
+    is_legacy_fingerprint,
+    legacy_fingerprint,
+)
+from wagtail_facebook_events.http import HTTPClientPool
 from wagtail_facebook_events.processors.image import EventImageProcessor
+from wagtail_facebook_events.settings import TRANSFORM_MODE, UPSERT
+from wagtail_facebook_events.transformers import EventTransformer
 
 logger = logging.getLogger(__name__)
 
 
 class BaseEventsProcessor(ABC):
-    def __init__(self):
+    def __init__(
+        self,
+        http: HTTPClientPool = None,
+        upsert: bool = UPSERT,
+        transform_mode: str = TRANSFORM_MODE,
+        page_id: str = None,
+    ):
+        # Stored as source_page_id on every created or updated event.
+        self.page_id = page_id
+        self.upsert_mode = upsert
+        self.transform_mode = transform_mode
         self.EventModel = get_event_model()
         self.EventSerializer = get_event_serializer()
+        self.DeadLetterModel = get_dead_letter_model()
+        self.transformer = EventTransformer(self.EventModel)
         self.image_model = get_image_model()
-        self.image_processor = EventImageProcessor()
+        self.http = http or HTTPClientPool()
+        self.image_processor = EventImageProcessor(http=self.http)
+        self.images_downloaded = 0
+
+    # Stored dead letters are overwritten by the latest failure of the event.
+    dead_letter_options = {
+        "update_conflicts": True,
+        "unique_fields": ["facebook_id"],
+        "update_fields": ["stage", "payload", "errors", "failed_at"],
+    }
 
     @abstractmethod
     def process_page(self, page):
         pass
 
-    def bulk_create(self, create_events):
+    def bulk_create(self, create_events, batch_size=None):
+        """Creates the valid events; returns the facebook_ids of the rejected ones.
+
+        Invalid events do not hold up the rest of the batch: they are
+        recorded in the dead-letter store and retried on the next import.
+        Events that another import stored since they were classified, e.g.
+        an event shared by two pages imported concurrently, are updated.
+        """
         logger.info("Starting bulk create for events")
         start_time = time.time()
-        create_serializer = self.EventSerializer(data=create_events, many=True)
-        if create_serializer.is_valid():
-            instances = [
-                self.EventModel(**data) for data in create_serializer.validated_data
-            ]
-            self.EventModel.objects.bulk_create(instances)
-            logger.info(
-                f"Bulk created {len(instances)} events in {time.time() - start_time:.2f} seconds"
+        instances, errors = self._instances_to_create(create_events)
+        try:
+            self._insert(instances, batch_size)
+        except IntegrityError:
+            stored_events = self._existing_events(
+                [instance.facebook_id for instance in instances]
             )
-        else:
-            logger.info(f"Bulk create failed: {create_serializer.errors}")
+            if not stored_events:
+                raise
+            rejected_ids = self._reject(create_events, errors, "create")
+            create_events, update_events = self._reclassify(
+                create_events, errors, stored_events
+            )
+            return (
+                rejected_ids
+                | self.bulk_create(create_events, batch_size)
+                | self.bulk_update(update_events, batch_size)
+            )
+        logger.info(
+            f"Bulk created {len(instances)} events "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+        return self._reject(create_events, errors, "create")
 
-    def bulk_update(self, update_events):
+    def bulk_update(self, update_events, batch_size=None):
+        """Updates the changed events, writing only the columns that changed.
+
+        Instances are grouped by their set of changed fields and every group
+        is written with its own ``bulk_update`` field list. Returns the
+        facebook_ids of the events that were rejected.
+        """
         logger.info("Starting bulk update for events")
         start_time = time.time()
-        update_instances = []
-
-        for data, instance in update_events:
-            serializer = self.EventSerializer(instance, data=data, partial=False)
-            if serializer.is_valid():
-                for field, value in serializer.validated_data.items():
-                    setattr(instance, field, value)
-                update_instances.append(instance)
-            else:
-                logger.info(
-                    f"Could not update event {instance.id}: {serializer.errors}"
-                )
-
-        if update_instances:
+        changed_groups, errors = self._changed_groups(update_events)
+        for fields, instances in changed_groups.items():
             self.EventModel.objects.bulk_update(
-                update_instances,
-                fields=[
-                    field.name
-                    for field in self.EventModel._meta.fields
-                    if not field.primary_key
-                ],
+                instances, fields=list(fields), batch_size=batch_size
             )
+        if changed_groups:
+            updated = sum(len(instances) for instances in changed_groups.values())
             logger.info(
-                f"Bulk updated {len(update_instances)} events in {time.time() - start_time:.2f} seconds"
+                f"Bulk updated {updated} events in {len(changed_groups)} field groups "
+                f"in {time.time() - start_time:.2f} seconds"
             )
+        return self._reject([data for data, _ in update_events], errors, "update")
+
+    def upsert(self, events, batch_size=None):
+        """Creates or updates the events with ``INSERT ... ON CONFLICT DO UPDATE``.
+
+        Events are grouped by the fields they provide, so a column that is
+        missing from an event (e.g. ``image`` after a failed download) keeps
+        its stored value; ``stop_import`` is never overwritten. Events whose
+        row has ``stop_import`` set must already have been filtered out, as
+        ``_partition_page`` does. Returns the facebook_ids of the events
+        that were rejected.
+        """
+        logger.info("Starting bulk upsert for events")
+        start_time = time.time()
+        groups, errors = self._upsert_groups(events)
+        for fields, instances in groups.items():
+            self.EventModel.objects.bulk_create(
+                instances, batch_size=batch_size, **self._upsert_options(fields)
+            )
+        logger.info(
+            f"Bulk upserted {len(events) - len(errors)} events "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+        return self._reject(events, errors, "upsert")
+
+    def bulk_rehash(self, rehashed_events, batch_size=None):
+        """Writes the upgraded fingerprints of events stored by earlier releases."""
+        if not rehashed_events:
+            return
+        self.EventModel.objects.bulk_update(
+            rehashed_events, fields=["hashed"], batch_size=batch_size
+        )
+        logger.info(f"Upgraded the fingerprint of {len(rehashed_events)} events")
+
+    def resolve_dead_letters(self, facebook_ids):
+        """Removes the dead letters of events that have since been imported."""
+        if self.DeadLetterModel is None or not facebook_ids:
+            return
+        self.DeadLetterModel.objects.filter(facebook_id__in=facebook_ids).delete()
+
+    def _reject(self, events, errors, stage):
+        """Logs the rejected events, stores them as dead letters; returns their ids."""
+        rejected_ids, dead_letters = self._dead_letters(events, errors, stage)
+        if dead_letters:
+            self.DeadLetterModel.objects.bulk_create(
+                dead_letters, **self.dead_letter_options
+            )
+        return rejected_ids
+
+    def _insert(self, instances, batch_size=None):
+        # The savepoint keeps a surrounding transaction usable after a conflict.
+        with transaction.atomic(using=self.EventModel.objects.db):
+            self.EventModel.objects.bulk_create(instances, batch_size=batch_size)
+
+    def _reclassify(self, create_events, errors, stored_events):
+        """Classifies the valid events of a failed create against the stored rows.
+
+        Returns the events that still have to be created and the updates.
+        """
+        logger.info(
+            f"{len(stored_events)} events were stored by another import; "
+            "updating them instead"
+        )
+        valid_events = [
+            event for index, event in enumerate(create_events) if index not in errors
+        ]
+        create_events, update_events, _ = self._classify_page(
+            valid_events, stored_events
+        )
+        return create_events, update_events
+
+    def _instances_to_create(self, create_events):
+        """Returns unsaved instances of the valid events, and the errors."""
+        rows, errors = self._to_rows(create_events)
+        return [self.EventModel(**row) for row in rows.values()], errors
+
+    def _changed_groups(self, update_events):
+        """Applies the updates to their instances, grouped by the fields that changed.
+
+        Returns the groups keyed by the sorted field names, and the errors
+        of the events that were rejected.
+        """
+        changed_groups = defaultdict(list)
+        rows, errors = self._to_rows(
+            [data for data, _ in update_events],
+            [instance for _, instance in update_events],
+        )
+        for index, (data, instance) in enumerate(update_events):
+            if index in errors:
+                continue
+            changed_fields = self._apply_changes(instance, rows[index])
+            if changed_fields:
+                changed_groups[tuple(sorted(changed_fields))].append(instance)
+        return changed_groups, errors
+
+    def _upsert_groups(self, events):
+        """Returns unsaved instances grouped by the fields they set, and the errors."""
+        rows, errors = self._to_rows(events)
+        groups = defaultdict(list)
+        for row in rows.values():
+            groups[tuple(sorted(row))].append(self.EventModel(**row))
+        return groups, errors
+
+    @staticmethod
+    def _upsert_options(fields):
+        return {
+            "update_conflicts": True,
+            "unique_fields": ["facebook_id"],
+            "update_fields": [
+                field for field in fields if field not in ("facebook_id", "stop_import")
+            ],
+        }
+
+    def _dead_letters(self, events, errors, stage):
+        """Logs the rejected events; returns their ids and unsaved dead letters."""
+        rejected_ids = set()
+        dead_letters = []
+        for index, event_errors in errors.items():
+            event = events[index]
+            rejected_ids.add(event.get("id"))
+            logger.warning(
+                f"Rejected event {event.get('id')} during {stage}: {event_errors}"
+            )
+            if self.DeadLetterModel is not None:
+                dead_letters.append(
+                    self.DeadLetterModel(
+                        facebook_id=event.get("id") or "",
+                        stage=stage,
+                        payload=event,
+                        errors=event_errors,
+                    )
+                )
+        return rejected_ids, dead_letters
+
+    def _to_rows(self, events, instances=None):
+        """Validates the events and converts them into model field values.
+
+        Returns the valid rows and the errors of the invalid events, both
+        keyed by position in ``events``. The fast transformer is used unless
+        ``transform_mode`` is ``"strict"``, which validates every event with
+        the configured DRF serializer.
+        """
+        if self.transform_mode != "strict":
+            rows, errors = self.transformer.transform_many(events)
+        else:
+            rows, errors = {}, {}
+            for index, event in enumerate(events):
+                instance = instances[index] if instances else None
+                serializer = self.EventSerializer(instance, data=event)
+                if serializer.is_valid():
+                    rows[index] = serializer.validated_data
+                else:
+                    errors[index] = serializer.errors
+        if self.page_id:
+            for row in rows.values():
+                row["source_page_id"] = self.page_id
+        return rows, errors
+
+    def _apply_changes(self, instance, row):
+        """Sets the values that differ on ``instance`` and returns their field names."""
+        changed_fields = []
+        for name, value in row.items():
+            field = self.EventModel._meta.get_field(name)
+            if field.is_relation:
+                name, value = field.attname, getattr(value, "pk", value)
+            if getattr(instance, name) != value:
+                setattr(instance, name, value)
+                changed_fields.append(field.name)
+        return changed_fields
+
+    def _partition_page(self, events):
+        """Sort a page of events into events to create, to update and to rehash.
+
+        All stored events of the page are loaded with a single query and
+        indexed by facebook_id, so a page costs one lookup instead of one
+        per event. Unchanged events and duplicates within the page are skipped.
+        Nothing is written: the upgraded fingerprints are stored with
+        ``bulk_rehash`` when the importer flushes.
+        """
+        existing_events = self._existing_events([event.get("id") for event in events])
+        return self._classify_page(events, existing_events)
+
+    def _classify_page(self, events, existing_events):
+        """Returns the events to create, to update and whose fingerprint to upgrade."""
+        create_events, update_events, rehashed_events = [], [], []
+        seen_ids = set()
+
+        for event in events:
+            event_id = event.get("id")
+            if event_id in seen_ids:
+                logger.info(f"Event {event_id} occurs twice on this page; skipping")
+                continue
+            seen_ids.add(event_id)
+
+            create_event, update_event = self._classify(
+                event, existing_events.get(event_id), rehashed_events
+            )
+            if create_event:
+                create_events.append(create_event)
+            if update_event:
+                update_events.append(update_event)
+        return create_events, update_events, rehashed_events
+
+    def _covers_to_download(self, create_events, update_events):
+        """Assigns already stored images to events whose cover is cached.
+
+        Returns the events whose cover still has to be downloaded, grouped
+        by cover source so every distinct cover is downloaded once.
+        """
+        events = self._events_with_covers(create_events, update_events)
+        image_pks = self.image_processor.cover_cache.get_many(
+            [event["cover"] for event in events]
+        )
+        return self._group_downloads(events, image_pks)
+
+    @staticmethod
+    def _events_with_covers(create_events, update_events):
+        return [
+            event
+            for event in create_events + [new_data for new_data, _ in update_events]
+            if event.get("cover", {}).get("source")
+        ]
+
+    @staticmethod
+    def _group_downloads(events, image_pks):
+        """Assigns the cached image pks; groups the other events by cover source."""
+        to_download = {}
+        for event, image_pk in zip(events, image_pks):
+            if image_pk is None:
+                to_download.setdefault(event["cover"]["source"], []).append(event)
+            else:
+                event["image"] = image_pk
+        reused = len(events) - sum(len(group) for group in to_download.values())
+        logger.info(
+            f"Reusing cached cover images for {reused} events; "
+            f"downloading {len(to_download)} covers"
+        )
+        return to_download
+
+    def _existing_events(self, event_ids):
+        """Returns the stored events for ``event_ids`` keyed by facebook_id.
+
+        Upserts never read the stored rows, so only the columns needed to
+        classify the events are loaded in upsert mode.
+        """
+        return {
+            event.facebook_id: event for event in self._existing_events_query(event_ids)
+        }
+
+    def _existing_events_query(self, event_ids):
+        events = self.EventModel.objects.filter(facebook_id__in=event_ids)
+        if self.upsert_mode:
+            events = events.only("facebook_id", "hashed", "stop_import")
+        return events
 
     def _create_or_update(self, json_event):
+        create_events, update_events, _ = self._partition_page([json_event])
+        return (create_events or [None])[0], (update_events or [None])[0]
+
+    def _classify(self, json_event, event_in_db, rehashed_events):
         event_id = json_event.get("id")
         event_hash = self._hash(json_event)
         logger.info(f"Processing event {event_id}")
 
-        if self.EventModel.objects.filter(facebook_id=event_id).exists():
-            event_in_db = self.EventModel.objects.get(facebook_id=event_id)
-            if event_hash != event_in_db.hashed and not event_in_db.stop_import:
-                json_event["hashed"] = event_hash
-                logger.info(f"Event {event_id} requires an update")
-                return None, (json_event, event_in_db)
-        else:
+        if event_in_db is None:
             json_event["hashed"] = event_hash
             logger.info(f"Event {event_id} will be created")
             return json_event, None
 
+        if event_hash != event_in_db.hashed and not event_in_db.stop_import:
+            # Rows stored by earlier releases carry a legacy fingerprint; when it
+            # still matches, only the fingerprint is rewritten.
+            if is_legacy_fingerprint(event_in_db.hashed) and (
+                legacy_fingerprint(json_event) == event_in_db.hashed
+            ):
+                event_in_db.hashed = event_hash
+                rehashed_events.append(event_in_db)
+            else:
+                json_event["hashed"] = event_hash
+                logger.info(f"Event {event_id} requires an update")
+                return None, (json_event, event_in_db)
+
         logger.info(f"Event {event_id} did not change; skipping")
         return None, None
 
     @staticmethod
     def _hash(event) -> str:
-        included_fields = [
-            "id",
-            "name",
-            "description",
-            "start_time",
-            "end_time",
-            "place",
-        ]
-        hash_string = "".join(
-            f"{key}:{value}" for key, value in event.items() if key in included_fields
-        )
-        return hashlib.sha256(hash_string.encode()).hexdigest()
+        return fingerprint(event)
@@ -3,6 +3,7 @@ import logging
 import time
 
 from asgiref.sync import sync_to_async
+from django.db import IntegrityError
 
 from wagtail_facebook_events.processors import BaseEventsProcessor
 from wagtail_facebook_events.processors.image import AsyncEventImageProcessor
@@ -11,34 +12,157 @@ logger = logging.getLogger(__name__)
 
 
 class AsyncEventsProcessor(BaseEventsProcessor):
-    def __init__(self):
-        super().__init__()
-        self.image_processor = AsyncEventImageProcessor()
+    """Processes and stores events with Django's asynchronous ORM.
+
+    Every page is read with a single asynchronous query and written with
+    ``abulk_create``/``abulk_update``, so the database work of a page costs
+    a constant number of executor hops instead of one per event. The
+    synchronous ``bulk_*`` methods remain available for synchronous callers.
+    """
+
+    def __init__(self, http=None, **kwargs):
+        super().__init__(http=http, **kwargs)
+        self.image_processor = AsyncEventImageProcessor(http=self.http)
 
     async def process_page(self, page):
         """Process each event page, downloading and saving images concurrently."""
         logger.info("Processing a page of events asynchronously")
         start_time = time.time()
         events = page.get("data", [])
-        create_events, update_events = [], []
-        image_tasks = []
-
-        for event in events:
-            create_event, update_event = await sync_to_async(self._create_or_update)(
-                event
-            )
-            if create_event:
-                create_events.append(create_event)
-                if create_event.get("cover", {}).get("source"):
-                    image_tasks.append(self.image_processor.download(create_event))
-            if update_event:
-                update_events.append(update_event)
-                if update_event[0].get("cover", {}).get("source"):
-                    image_tasks.append(self.image_processor.download(update_event[0]))
+        create_events, update_events, rehashed_events = await self.apartition_page(
+            events
+        )
+        to_download = list(
+            (await self._acovers_to_download(create_events, update_events)).values()
+        )
 
         # Await all download and save tasks to complete
-        saved_images = await asyncio.gather(*image_tasks)
+        saved_images = await asyncio.gather(
+            *[self.image_processor.download(events[0]) for events in to_download]
+        )
+        for events, image_pk in zip(to_download, saved_images):
+            if image_pk is not None:
+                self.images_downloaded += 1
+                for event in events:
+                    event["image"] = image_pk
         logger.info(
             f"Finished processing page in {time.time() - start_time:.2f} seconds"
         )
-        return create_events, update_events
+        return create_events, update_events, rehashed_events
+
+    async def apartition_page(self, events):
+        """Sort a page of events into events to create, to update and to rehash."""
+        existing_events = {
+            event.facebook_id: event
+            async for event in self._existing_events_query(
+                [event.get("id") for event in events]
+            )
+        }
+        return self._classify_page(events, existing_events)
+
+    async def abulk_create(self, create_events, batch_size=None):
+        logger.info("Starting bulk create for events")
+        start_time = time.time()
+        instances, errors = await self._aprepare(
+            self._instances_to_create, create_events
+        )
+        try:
+            await sync_to_async(self._insert)(instances, batch_size)
+        except IntegrityError:
+            stored_events = {
+                event.facebook_id: event
+                async for event in self._existing_events_query(
+                    [instance.facebook_id for instance in instances]
+                )
+            }
+            if not stored_events:
+                raise
+            rejected_ids = await self._areject(create_events, errors, "create")
+            create_events, update_events = self._reclassify(
+                create_events, errors, stored_events
+            )
+            return (
+                rejected_ids
+                | await self.abulk_create(create_events, batch_size)
+                | await self.abulk_update(update_events, batch_size)
+            )
+        logger.info(
+            f"Bulk created {len(instances)} events "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+        return await self._areject(create_events, errors, "create")
+
+    async def abulk_update(self, update_events, batch_size=None):
+        logger.info("Starting bulk update for events")
+        start_time = time.time()
+        changed_groups, errors = await self._aprepare(
+            self._changed_groups, update_events
+        )
+        for fields, instances in changed_groups.items():
+            await self.EventModel.objects.abulk_update(
+                instances, fields=list(fields), batch_size=batch_size
+            )
+        if changed_groups:
+            updated = sum(len(instances) for instances in changed_groups.values())
+            logger.info(
+                f"Bulk updated {updated} events in {len(changed_groups)} field groups "
+                f"in {time.time() - start_time:.2f} seconds"
+            )
+        return await self._areject(
+            [data for data, _ in update_events], errors, "update"
+        )
+
+    async def aupsert(self, events, batch_size=None):
+        logger.info("Starting bulk upsert for events")
+        start_time = time.time()
+        groups, errors = await self._aprepare(self._upsert_groups, events)
+        for fields, instances in groups.items():
+            await self.EventModel.objects.abulk_create(
+                instances, batch_size=batch_size, **self._upsert_options(fields)
+            )
+        logger.info(
+            f"Bulk upserted {len(events) - len(errors)} events "
+            f"in {time.time() - start_time:.2f} seconds"
+        )
+        return await self._areject(events, errors, "upsert")
+
+    async def abulk_rehash(self, rehashed_events, batch_size=None):
+        if not rehashed_events:
+            return
+        await self.EventModel.objects.abulk_update(
+            rehashed_events, fields=["hashed"], batch_size=batch_size
+        )
+        logger.info(f"Upgraded the fingerprint of {len(rehashed_events)} events")
+
+    async def aresolve_dead_letters(self, facebook_ids):
+        if self.DeadLetterModel is None or not facebook_ids:
+            return
+        await self.DeadLetterModel.objects.filter(
+            facebook_id__in=facebook_ids
+        ).adelete()
+
+    async def _aprepare(self, prepare, events):
+        """Runs ``prepare`` on ``events``, off the event loop in strict mode.
+
+        The DRF serializer of strict mode looks up related objects such as
+        the image with synchronous queries, which Django refuses to run on
+        the event loop.
+        """
+        if self.transform_mode == "strict":
+            return await sync_to_async(prepare)(events)
+        return prepare(events)
+
+    async def _areject(self, events, errors, stage):
+        rejected_ids, dead_letters = self._dead_letters(events, errors, stage)
+        if dead_letters:
+            await self.DeadLetterModel.objects.abulk_create(
+                dead_letters, **self.dead_letter_options
+            )
+        return rejected_ids
+
+    async def _acovers_to_download(self, create_events, update_events):
+        events = self._events_with_covers(create_events, update_events)
+        image_pks = await self.image_processor.cover_cache.aget_many(
+            [event["cover"] for event in events]
+        )
+        return self._group_downloads(events, image_pks)
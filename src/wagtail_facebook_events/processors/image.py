@@ -1,71 +1,311 @@
+import asyncio
+import hashlib
 import logging
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
-from typing import Optional
-from urllib.request import urlopen
+from typing import Dict, List, Optional
 
 import httpx
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
 from django.core.files import File
 from wagtail.images import get_image_model
 
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.settings import (
+    IMAGE_CACHE_ALIAS,
+    IMAGE_CACHE_TIMEOUT,
+    IMAGE_DOWNLOAD_CHUNK_SIZE,
+    IMAGE_DOWNLOAD_CONCURRENCY,
+    IMAGE_DOWNLOAD_PER_HOST,
+    IMAGE_DOWNLOAD_THREADS,
+    IMAGE_MAX_BYTES,
+)
+
 logger = logging.getLogger(__name__)
 
+
+class ImageTooLargeError(Exception):
+    """Raised when a cover exceeds the configured maximum size."""
+
+
+class CoverImageCache:
+    """Maps Facebook covers to the Wagtail images they were stored as.
+
+    Covers are keyed by their Facebook id and source URL in Django's cache,
+    so an unchanged cover is never downloaded twice. Downloaded files are
+    matched on their content digest (Wagtail's ``file_hash``), so identical
+    images are stored only once.
+    """
+
+    key_prefix = "wagtail_facebook_events:cover"
+
+    def __init__(self, alias: str = IMAGE_CACHE_ALIAS):
+        self.cache = caches[alias]
+        self.image_model = get_image_model()
+
+    def keys(self, cover: Dict) -> List[str]:
+        keys = []
+        if cover.get("id"):
+            keys.append(f"{self.key_prefix}:id:{cover['id']}")
+        if cover.get("source"):
+            # Source URLs are too long for some cache backends' keys.
+            source_hash = hashlib.sha1(cover["source"].encode()).hexdigest()
+            keys.append(f"{self.key_prefix}:source:{source_hash}")
+        return keys
+
+    def get_many(self, covers: List[Dict]) -> List[Optional[int]]:
+        """Returns the stored image pk for every cover, or ``None`` if unknown."""
+        covers_keys = [self.keys(cover) for cover in covers]
+        cached = self.cache.get_many(
+            [key for cover_keys in covers_keys for key in cover_keys]
+        )
+        if not cached:
+            return [None] * len(covers)
+        # Images may have been deleted since they were cached.
+        existing_pks = set(self._existing_pks(cached))
+        return self._match(covers_keys, cached, existing_pks)
+
+    async def aget_many(self, covers: List[Dict]) -> List[Optional[int]]:
+        covers_keys = [self.keys(cover) for cover in covers]
+        cached = await self.cache.aget_many(
+            [key for cover_keys in covers_keys for key in cover_keys]
+        )
+        if not cached:
+            return [None] * len(covers)
+        existing_pks = {pk async for pk in self._existing_pks(cached)}
+        return self._match(covers_keys, cached, existing_pks)
+
+    def _existing_pks(self, cached: Dict[str, int]):
+        return self.image_model.objects.filter(pk__in=set(cached.values())).values_list(
+            "pk", flat=True
+        )
+
+    @staticmethod
+    def _match(covers_keys, cached, existing_pks) -> List[Optional[int]]:
+        image_pks = []
+        for cover_keys in covers_keys:
+            image_pk = next(
+                (cached[key] for key in cover_keys if cached.get(key) in existing_pks),
+                None,
+            )
+            image_pks.append(image_pk)
+        return image_pks
+
+    def set(self, cover: Dict, image_pk: int):
+        self.cache.set_many(
+            {key: image_pk for key in self.keys(cover)}, timeout=IMAGE_CACHE_TIMEOUT
+        )
+
+    async def aset(self, cover: Dict, image_pk: int):
+        await self.cache.aset_many(
+            {key: image_pk for key in self.keys(cover)}, timeout=IMAGE_CACHE_TIMEOUT
+        )
+
+    def find_by_digest(self, digest: str):
+        """Returns an already stored image with the same content, if any."""
+        return self.image_model.objects.filter(file_hash=digest).first()
+
+    async def afind_by_digest(self, digest: str):
+        return await self.image_model.objects.filter(file_hash=digest).afirst()
+
+
 class BaseImageProcessor(ABC):
     image_model = get_image_model()
 
+    def __init__(
+        self,
+        http: HTTPClientPool = None,
+        cover_cache: CoverImageCache = None,
+        chunk_size: int = IMAGE_DOWNLOAD_CHUNK_SIZE,
+        max_bytes: int = IMAGE_MAX_BYTES,
+    ):
+        self.http = http or HTTPClientPool()
+        self.cover_cache = cover_cache or CoverImageCache()
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
     @abstractmethod
     def download(self, url):
         pass
 
-class EventImageProcessor(BaseImageProcessor):
-    def download(self, event) -> Optional[int]:
-        logger.info(f"Downloading image for event {event.get('id')}")
-        start_time = time.time()
-        response = urlopen(event["cover"]["source"])
-        image_temp = NamedTemporaryFile(delete=True)
-        image_temp.write(response.read())
-        image_temp.flush()
-        image_model = get_image_model()
+    def _check_size(self, url, size):
+        if size > self.max_bytes:
+            raise ImageTooLargeError(f"{url} exceeds {self.max_bytes} bytes")
+
+    def _create_image(self, image_temp, event, digest: str, size: int):
         name = event["name"]
-        image, created = image_model.objects.get_or_create(
+        return self.image_model.objects.create(
             title=name,
             file=File(image_temp, name=f"{name}.jpg"),
+            file_hash=digest,
+            file_size=size,
         )
+
+
+class EventImageProcessor(BaseImageProcessor):
+    """Downloads covers in a thread pool of ``threads`` workers.
+
+    Only the HTTP transfers run in the pool; the images are saved on the
+    calling thread, so all ORM writes stay on its database connection.
+    """
+
+    def __init__(
+        self,
+        http: HTTPClientPool = None,
+        cover_cache: CoverImageCache = None,
+        threads: int = IMAGE_DOWNLOAD_THREADS,
+        **kwargs,
+    ):
+        super().__init__(http=http, cover_cache=cover_cache, **kwargs)
+        self.threads = threads
+
+    def download(self, event) -> Optional[int]:
+        return self.download_many([event])[0]
+
+    def download_many(self, events) -> List[Optional[int]]:
+        """Downloads the cover of every event and returns the image pks in order.
+
+        Failed downloads are logged and returned as ``None``.
+        """
+        start_time = time.time()
+        image_pks = []
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = [
+                executor.submit(self._fetch, event["cover"]["source"])
+                for event in events
+            ]
+            for event, future in zip(events, futures):
+                try:
+                    image_temp, digest, size = future.result()
+                except (httpx.HTTPError, ImageTooLargeError) as e:
+                    logger.error(
+                        f"Failed to download image for event {event.get('id')}: {e}"
+                    )
+                    image_pks.append(None)
+                    continue
+                try:
+                    image_pks.append(self._save_image(image_temp, event, digest, size))
+                finally:
+                    image_temp.close()
         logger.info(
-            f"Downloaded and saved image for event {event.get('id')} in {time.time() - start_time:.2f} seconds"
+            f"Downloaded and saved {len(events)} images "
+            f"in {time.time() - start_time:.2f} seconds"
         )
+        return image_pks
+
+    def _fetch(self, url):
+        """Streams the body of ``url`` into a temporary file; runs in the pool."""
+        image_temp = NamedTemporaryFile(delete=True)
+        digest = hashlib.sha1()
+        size = 0
+        try:
+            with self.http.client.stream("GET", url) as response:
+                response.raise_for_status()
+                self._check_size(url, int(response.headers.get("Content-Length") or 0))
+                for chunk in response.iter_bytes(self.chunk_size):
+                    size += len(chunk)
+                    self._check_size(url, size)
+                    digest.update(chunk)
+                    image_temp.write(chunk)
+            image_temp.flush()
+        except BaseException:
+            image_temp.close()
+            raise
+        return image_temp, digest.hexdigest(), size
+
+    def _save_image(self, image_temp, event, digest, size) -> int:
+        """Save the downloaded image unless an identical image is already stored."""
+        image = self.cover_cache.find_by_digest(digest)
+        if image is None:
+            image = self._create_image(image_temp, event, digest, size)
+        self.cover_cache.set(event["cover"], image.pk)
         return image.pk
 
 
 class AsyncEventImageProcessor(BaseImageProcessor):
-    async def download(self, event):
-        """Downloads the image and immediately saves it to the database."""
-        logger.info(f"Downloading image for event {event.get('id')}")
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(event["cover"]["source"])
-                response.raise_for_status()
+    """Downloads covers concurrently, within a global and a per-host limit.
 
-                image_temp = NamedTemporaryFile(delete=True)
-                image_temp.write(response.content)
-                image_temp.flush()
+    Bodies are streamed to disk in chunks and abandoned once they exceed
+    ``max_bytes``, so large pages of covers never build up in memory.
+    The synchronous processor streams the same way.
+    """
 
-                # As soon as download completes, save the image to the database
-                return await self._save_image(image_temp, event)
-        except httpx.HTTPError as e:
+    def __init__(
+        self,
+        http: HTTPClientPool = None,
+        cover_cache: CoverImageCache = None,
+        concurrency: int = IMAGE_DOWNLOAD_CONCURRENCY,
+        per_host: int = IMAGE_DOWNLOAD_PER_HOST,
+        **kwargs,
+    ):
+        super().__init__(http=http, cover_cache=cover_cache, **kwargs)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self._loop = None
+        self._semaphore = None
+        self._host_semaphores = {}
+        self._save_lock = None
+
+    async def download(self, event) -> Optional[int]:
+        """Downloads the image and immediately saves it to the database.
+
+        Returns the image pk; failed downloads are logged and return ``None``.
+        """
+        source = event["cover"]["source"]
+        host_semaphore, semaphore = self._semaphores(httpx.URL(source).host)
+        image_temp = NamedTemporaryFile(delete=True)
+        try:
+            # Wait for the host first, so a busy host does not hold global slots.
+            async with host_semaphore, semaphore:
+                logger.info(f"Downloading image for event {event.get('id')}")
+                digest, size = await self._stream_to_file(source, image_temp)
+            # As soon as download completes, save the image to the database
+            return await self._save_image(image_temp, event, digest, size)
+        except (httpx.HTTPError, ImageTooLargeError) as e:
             logger.error(f"Failed to download image for event {event.get('id')}: {e}")
-            return None, event.get("id")
+            return None
+        finally:
+            image_temp.close()
 
-    async def _save_image(self, image_temp, event):
-        """Save the downloaded image to the database."""
-        name = event["name"]
-        image_model = self.image_model
+    async def _stream_to_file(self, url, image_temp):
+        """Streams the body of ``url`` into ``image_temp``; returns digest and size."""
+        digest = hashlib.sha1()
+        size = 0
+        async with self.http.async_client.stream("GET", url) as response:
+            response.raise_for_status()
+            self._check_size(url, int(response.headers.get("Content-Length") or 0))
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                size += len(chunk)
+                self._check_size(url, size)
+                digest.update(chunk)
+                image_temp.write(chunk)
+        image_temp.flush()
+        return digest.hexdigest(), size
 
-        image, created = await image_model.objects.aget_or_create(
-            title=name,
-            file=File(image_temp, name=f"{name}.jpg"),
-        )
-        image_temp.close()
+    def _semaphores(self, host):
+        # Semaphores belong to an event loop, and a processor may outlive one.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._host_semaphores = {}
+            self._save_lock = asyncio.Lock()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._host_semaphores[host], self._semaphore
+
+    async def _save_image(self, image_temp, event, digest, size):
+        """Save the downloaded image unless an identical image is already stored."""
+        # Concurrent downloads of identical covers must not both create an image.
+        async with self._save_lock:
+            image = await self.cover_cache.afind_by_digest(digest)
+            if image is None:
+                image = await sync_to_async(self._create_image)(
+                    image_temp, event, digest, size
+                )
+        await self.cover_cache.aset(event["cover"], image.pk)
         event["image"] = image.pk
         return image.pk
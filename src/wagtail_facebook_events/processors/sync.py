@@ -10,20 +10,22 @@ class EventsProcessor(BaseEventsProcessor):
     def process_page(self, page):
         logger.info("Processing a page of events")
         start_time = time.time()
-        events = page.get("data", [])
-        create_events, update_events = [], []
+        create_events, update_events, rehashed_events = self._partition_page(
+            page.get("data", [])
+        )
 
-        for event in events:
-            create_event, update_event = self._create_or_update(event)
-            if create_event:
-                if create_event.get("cover", {}).get("source"):
-                    create_event["image"] = self.image_processor.download(create_event)
-                create_events.append(create_event)
-            if update_event:
-                new_data, instance = update_event
-                if new_data.get("cover", {}).get("source"):
-                    new_data["image"] = self.image_processor.download(new_data)
-                update_events.append((new_data, instance))
+        to_download = list(
+            self._covers_to_download(create_events, update_events).values()
+        )
+        image_pks = self.image_processor.download_many(
+            [events[0] for events in to_download]
+        )
+        for events, image_pk in zip(to_download, image_pks):
+            if image_pk is None:
+                continue
+            self.images_downloaded += 1
+            for event in events:
+                event["image"] = image_pk
 
         logger.info(f"Processed page in {time.time() - start_time:.2f} seconds")
-        return create_events, update_events
+        return create_events, update_events, rehashed_events
@@ -0,0 +1,97 @@
+from typing import Any, Dict
+
+from django.core.cache import caches
+from django.utils import timezone
+
+from wagtail_facebook_events.settings import IMPORT_CACHE_ALIAS, IMPORT_LOCK_TIMEOUT
+
+
+class ImportProgress:
+    """Lock, status and counters of the running import, kept in Django's cache.
+
+    The importer adds to the counters as it goes and the admin status
+    endpoint reads them, so the cache must be shared between processes
+    (e.g. Redis or Memcached) when the import runs in another process.
+    Every counter is its own cache key, so concurrent writers never lose
+    an increment.
+    """
+
+    key_prefix = "wagtail_facebook_events:import"
+    counters = [
+        "pages_fetched",
+        "events_created",
+        "events_updated",
+        "events_rejected",
+        "images_downloaded",
+    ]
+
+    def __init__(self, alias: str = IMPORT_CACHE_ALIAS):
+        self.cache = caches[alias]
+
+    def acquire(self) -> bool:
+        """Takes the import lock; returns ``False`` if an import is already running.
+
+        The lock expires after ``IMPORT_LOCK_TIMEOUT`` seconds, so a crashed
+        import does not block the next one forever.
+        """
+        return self.cache.add(
+            f"{self.key_prefix}:lock", True, timeout=IMPORT_LOCK_TIMEOUT
+        )
+
+    def release(self):
+        self.cache.delete(f"{self.key_prefix}:lock")
+
+    def start(self):
+        """Resets the counters and marks an import as running."""
+        self.cache.set_many(
+            {
+                **{self._key(name): 0 for name in self.counters},
+                self._key("status"): "running",
+                self._key("started_at"): timezone.now().isoformat(),
+                self._key("finished_at"): None,
+                self._key("error"): None,
+            },
+            timeout=None,
+        )
+
+    def finish(self, error: str = None):
+        self.cache.set_many(
+            {
+                self._key("status"): "failed" if error else "finished",
+                self._key("finished_at"): timezone.now().isoformat(),
+                self._key("error"): error,
+            },
+            timeout=None,
+        )
+
+    def add(self, **counts: int):
+        for name, count in counts.items():
+            if not count:
+                continue
+            try:
+                self.cache.incr(self._key(name), count)
+            except ValueError:
+                # The counter expired or the import was not started through start().
+                self.cache.set(self._key(name), count, timeout=None)
+
+    async def aadd(self, **counts: int):
+        for name, count in counts.items():
+            if not count:
+                continue
+            try:
+                await self.cache.aincr(self._key(name), count)
+            except ValueError:
+                await self.cache.aset(self._key(name), count, timeout=None)
+
+    def get(self) -> Dict[str, Any]:
+        """Returns the status of the latest import, with its counters."""
+        names = ["status", "started_at", "finished_at", "error", *self.counters]
+        values = self.cache.get_many([self._key(name) for name in names])
+        status = {name: values.get(self._key(name)) for name in names}
+        status["status"] = status["status"] or "idle"
+        for name in self.counters:
+            status[name] = status[name] or 0
+        return status
+
+    def _key(self, name: str) -> str:
+        return f"{self.key_prefix}:{name}"
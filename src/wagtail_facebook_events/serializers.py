@@ -1,9 +1,13 @@
-import re
 from datetime import datetime
 
 from rest_framework import serializers
 
 from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.transformers import (
+    convert_description,
+    parse_graph_datetime,
+)
+
 
 class FacebookEventSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,6 +35,11 @@ class FacebookEventSerializer(serializers.ModelSerializer):
             "url",
             "ticket_url",
         ]
+        extra_kwargs = {
+            # Uniqueness is guaranteed by the importer and the database; a
+            # UniqueValidator would cost a query per event and reject upserts.
+            "facebook_id": {"validators": []},
+        }
         abstract = True
 
     def to_internal_value(self, data):
@@ -66,28 +75,14 @@ class FacebookEventSerializer(serializers.ModelSerializer):
     @staticmethod
     def _parse_datetime(datetime_str):
         """Parse a datetime string and return a datetime object."""
-        try:
-            return datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M:%S%z")
-        except ValueError:
-            return None
+        return parse_graph_datetime(datetime_str)
 
     @staticmethod
     def _parse_time(datetime_str):
-        try:
-            dt = datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M:%S%z")
-            return dt.time()
-        except ValueError:
-            return None
+        dt = parse_graph_datetime(datetime_str)
+        return dt.time() if dt else None
 
     @staticmethod
     def _convert_unicode_description(description: str):
-        # Convert URLs into clickable links
-        url_pattern = re.compile(r"(https?://[^\s]+)")
-        description = url_pattern.sub(
-            r'<a href="\1" target="_blank">\1</a>', description
-        )
-
-        # Preserve newlines in description
-        description = description.replace("\n", "<br>")
-
-        return description
+        # Convert URLs into clickable links and preserve newlines
+        return convert_description(description)
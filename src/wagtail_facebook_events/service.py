@@ -1,9 +1,149 @@
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, connection
+
 from wagtail_facebook_events import get_importer
+from wagtail_facebook_events.pages import PageRegistry
+from wagtail_facebook_events.progress import ImportProgress
+from wagtail_facebook_events.settings import PAGE_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class PageImportError(Exception):
+    """Raised after importing several pages when some of them failed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "Import failed for pages "
+            + ", ".join(f"{page_id} ({error})" for page_id, error in errors.items())
+        )
 
 
 class FacebookEventsImporterService:
-    def __init__(self):
-        self.importer = get_importer()
+    def __init__(
+        self,
+        progress: ImportProgress = None,
+        registry: PageRegistry = None,
+        max_concurrency: int = PAGE_CONCURRENCY,
+    ):
+        self.progress = progress or ImportProgress()
+        self.registry = registry or PageRegistry()
+        self.max_concurrency = max_concurrency
+        self.thread = None
 
     def import_events(self):
-        return self.importer.import_events()
+        """Runs the configured importer in this thread and returns its result."""
+        return self._run(get_importer(progress=self.progress))
+
+    def import_pages(
+        self,
+        force: bool = False,
+        wait: bool = False,
+        progress: ImportProgress = None,
+    ):
+        """Imports the registered pages, at most ``max_concurrency`` at a time.
+
+        Unless ``force`` is set only the pages that are due are imported, so
+        this can be called on a fixed schedule. Pages that another process is
+        importing are skipped. Returns the result of every page by page id,
+        and raises ``PageImportError`` once all pages ran if any of them failed.
+
+        Importers that hand the work to Celery return the id of their task,
+        or with ``wait`` its result once all workers finished; never wait
+        inside a Celery task.
+
+        Only the run started from the admin passes ``progress``, so scheduled
+        runs never write into the progress the admin reports.
+        """
+        pages = self.registry.pages if force else self.registry.due()
+        logger.info(f"Importing {len(pages)} Facebook pages")
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {
+                page["page_id"]: executor.submit(
+                    self._import_page, page, wait, progress
+                )
+                for page in pages
+            }
+            for page_id, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.exception(f"Import of page {page_id} failed")
+                    errors[page_id] = e
+                else:
+                    if result is not None:
+                        results[page_id] = result
+        if errors:
+            raise PageImportError(errors)
+        return results
+
+    def start_import(self) -> bool:
+        """Starts importing every registered page in a background thread.
+
+        Returns ``False`` without starting anything if another import holds
+        the lock, so repeated clicks in the admin never start a second run.
+        """
+        if not self.progress.acquire():
+            logger.info("An import is already running; not starting another")
+            return False
+        self.progress.start()
+        self.thread = threading.Thread(
+            target=self._run_in_background, name="facebook-events-import", daemon=True
+        )
+        self.thread.start()
+        return True
+
+    def _import_page(self, page, wait=False, progress=None):
+        """Imports one registered page; runs in the pool."""
+        page_id = page["page_id"]
+        if not self.registry.acquire(page_id):
+            logger.info(f"Page {page_id} is already being imported; skipping it")
+            return None
+        try:
+            options = {
+                key: page[key] for key in ("full_sync", "incremental") if key in page
+            }
+            importer = get_importer(
+                progress=progress,
+                page_id=page_id,
+                access_token=page.get("access_token"),
+                **options,
+            )
+            result = self._run(importer, wait=wait)
+            self.registry.mark_imported(page_id)
+            return result
+        finally:
+            self.registry.release(page_id)
+            connection.close()
+
+    @staticmethod
+    def _run(importer, wait=False):
+        """Runs an importer; asynchronous importers run on a new event loop."""
+        result = importer.import_events()
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        if importer.deferred:
+            # An AsyncResult cannot be serialised into a Celery result backend.
+            return result.get() if wait else result.id
+        return result
+
+    def _run_in_background(self):
+        try:
+            # Waiting keeps the lock and the progress open until Celery
+            # workers, if any, have finished.
+            self.import_pages(force=True, wait=True, progress=self.progress)
+        except Exception as e:
+            logger.exception("Background import of Facebook events failed")
+            self.progress.finish(error=str(e))
+        else:
+            self.progress.finish()
+        finally:
+            self.progress.release()
+            close_old_connections()
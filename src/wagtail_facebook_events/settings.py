@@ -12,8 +12,115 @@ EVENT_MODEL = get_setting("EVENT_MODEL", "wagtail_facebook_events.FacebookEvent"
 EVENT_SERIALIZER = get_setting(
     "EVENT_SERIALIZER", "wagtail_facebook_events.serializers.FacebookEventSerializer"
 )
+SYNC_CURSOR_MODEL = get_setting("SYNC_CURSOR_MODEL")
+# Events that fail validation are stored here; without a model they are only logged.
+DEAD_LETTER_MODEL = get_setting("DEAD_LETTER_MODEL")
 ACCESS_TOKEN = get_setting("ACCESS_TOKEN", "")
 APP_ID = get_setting("APP_ID", "")
 APP_SECRET = get_setting("APP_SECRET", "")
 PAGE_ID = get_setting("PAGE_ID", "")
+# Facebook pages to import, as dicts with a "page_id", an "access_token" and
+# optionally "interval" (seconds between scheduled imports), "full_sync" and
+# "incremental". Without it, PAGE_ID is imported with ACCESS_TOKEN.
+PAGES = get_setting("PAGES", [])
+PAGE_IMPORT_INTERVAL = get_setting("PAGE_IMPORT_INTERVAL", 60 * 60)
+# Pages imported at the same time by import_due_pages.
+PAGE_CONCURRENCY = get_setting("PAGE_CONCURRENCY", 4)
 FULL_SYNC = get_setting("FULL_SYNC", False)
+# Graph fields requested for every event. Nested objects are projected with
+# Graph's syntax, e.g. "cover{id,source}", or as {"cover": ["id", "source"]}.
+EVENT_FIELDS = get_setting(
+    "EVENT_FIELDS",
+    [
+        "name",
+        "description",
+        "start_time",
+        "end_time",
+        "cover{id,source}",
+        # Unprojected, as earlier releases requested it: their fingerprints
+        # hash the place as Graph returns it.
+        "place",
+        "ticket_uri",
+        "updated_time",
+    ],
+)
+# Initial, smallest and largest limit of events listings. With
+# ADAPTIVE_PAGE_SIZE the limit follows the observed time and size of pages,
+# unless RESPONSE_CACHE is on: cached pages are keyed by their limit.
+ADAPTIVE_PAGE_SIZE = get_setting("ADAPTIVE_PAGE_SIZE", True)
+PAGE_SIZE = get_setting("PAGE_SIZE", 25)
+PAGE_SIZE_MIN = get_setting("PAGE_SIZE_MIN", 5)
+PAGE_SIZE_MAX = get_setting("PAGE_SIZE_MAX", 100)
+PAGE_TARGET_SECONDS = get_setting("PAGE_TARGET_SECONDS", 2.0)
+PAGE_TARGET_BYTES = get_setting("PAGE_TARGET_BYTES", 1024 * 1024)
+INCREMENTAL_SYNC = get_setting("INCREMENTAL_SYNC", False)
+# Seconds subtracted from the last run when filtering with ``since``.
+INCREMENTAL_SYNC_OVERLAP = get_setting("INCREMENTAL_SYNC_OVERLAP", 3600)
+# Root of the Graph API, versioned; a local stand-in can be set for load tests.
+GRAPH_URL = get_setting("GRAPH_URL", "https://graph.facebook.com/v20.0")
+HTTP_MAX_CONNECTIONS = get_setting("HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = get_setting("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)
+HTTP_KEEPALIVE_EXPIRY = get_setting("HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP_TIMEOUT = get_setting("HTTP_TIMEOUT", 30.0)
+HTTP2 = get_setting("HTTP2", False)
+# Graph usage percentage from which requests are slowed down, the longest
+# delay that adds per request, and the retries of rate-limited or failed
+# requests with jittered exponential backoff.
+THROTTLE_SLOWDOWN_AT = get_setting("THROTTLE_SLOWDOWN_AT", 75)
+THROTTLE_MAX_DELAY = get_setting("THROTTLE_MAX_DELAY", 10.0)
+RETRY_ATTEMPTS = get_setting("RETRY_ATTEMPTS", 5)
+RETRY_BACKOFF_BASE = get_setting("RETRY_BACKOFF_BASE", 1.0)
+RETRY_BACKOFF_MAX = get_setting("RETRY_BACKOFF_MAX", 60.0)
+# Remember the ETag, Last-Modified and digest of imported events pages, and
+# skip pages that have not changed since. Entries expire after the timeout,
+# which bounds how long a page can be skipped.
+RESPONSE_CACHE = get_setting("RESPONSE_CACHE", False)
+RESPONSE_CACHE_ALIAS = get_setting("RESPONSE_CACHE_ALIAS", "default")
+RESPONSE_CACHE_TIMEOUT = get_setting("RESPONSE_CACHE_TIMEOUT", 60 * 60 * 24)
+IMAGE_CACHE_ALIAS = get_setting("IMAGE_CACHE_ALIAS", "default")
+IMAGE_CACHE_TIMEOUT = get_setting("IMAGE_CACHE_TIMEOUT", 60 * 60 * 24 * 30)
+IMAGE_DOWNLOAD_CONCURRENCY = get_setting("IMAGE_DOWNLOAD_CONCURRENCY", 10)
+IMAGE_DOWNLOAD_PER_HOST = get_setting("IMAGE_DOWNLOAD_PER_HOST", 4)
+IMAGE_DOWNLOAD_CHUNK_SIZE = get_setting("IMAGE_DOWNLOAD_CHUNK_SIZE", 64 * 1024)
+IMAGE_MAX_BYTES = get_setting("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+IMAGE_DOWNLOAD_THREADS = get_setting("IMAGE_DOWNLOAD_THREADS", 8)
+# Split full syncs into this many since/until windows whose pages are fetched
+# concurrently. The range is only used to place the window boundaries (unix
+# timestamps; by default ten years back to two years ahead): the first and
+# last windows are open-ended.
+SYNC_SHARDS = get_setting("SYNC_SHARDS", 1)
+SYNC_SHARD_SINCE = get_setting("SYNC_SHARD_SINCE", None)
+SYNC_SHARD_UNTIL = get_setting("SYNC_SHARD_UNTIL", None)
+# Events pages the asynchronous importer fetches ahead of the one it processes.
+PREFETCH_DEPTH = get_setting("PREFETCH_DEPTH", 2)
+# Flush queued changes every N events instead of once at the end of a run.
+FLUSH_BATCH_SIZE = get_setting("FLUSH_BATCH_SIZE", None)
+# Rows per INSERT/UPDATE statement of a flush; None leaves it to Django.
+DB_BATCH_SIZE = get_setting("DB_BATCH_SIZE", None)
+# Persist pages with INSERT ... ON CONFLICT DO UPDATE instead of separate
+# bulk_create and bulk_update calls.
+UPSERT = get_setting("UPSERT", False)
+# Cache holding the lock and progress of admin-started imports, and how long
+# that lock may be held before another import can start.
+IMPORT_CACHE_ALIAS = get_setting("IMPORT_CACHE_ALIAS", "default")
+IMPORT_LOCK_TIMEOUT = get_setting("IMPORT_LOCK_TIMEOUT", 60 * 60)
+# Events per page sent to a Celery worker, and per bulk write in that worker.
+CELERY_PAGE_SIZE = get_setting("CELERY_PAGE_SIZE", 25)
+CELERY_DB_BATCH_SIZE = get_setting("CELERY_DB_BATCH_SIZE", 500)
+# Graph fields, as dotted paths, that decide whether a stored event changed.
+HASH_FIELDS = get_setting(
+    "HASH_FIELDS",
+    [
+        "id",
+        "name",
+        "description",
+        "start_time",
+        "end_time",
+        "place",
+        "ticket_uri",
+        "cover.id",
+    ],
+)
+# "fast" validates events with the model fields in one pass, "strict" with
+# EVENT_SERIALIZER; use "strict" when that serializer is customised.
+TRANSFORM_MODE = get_setting("TRANSFORM_MODE", "fast")
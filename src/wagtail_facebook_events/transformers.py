@@ -0,0 +1,139 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from django.core.exceptions import ValidationError
+
+from wagtail_facebook_events import get_event_model
+
+GRAPH_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+URL_PATTERN = re.compile(r"(https?://[^\s]+)")
+
+# Model fields produced from a Graph event, as passed to the model constructor.
+ROW_FIELDS = [
+    "facebook_id",
+    "hashed",
+    "name",
+    "date",
+    "image_id",
+    "start_time",
+    "end_time",
+    "venue",
+    "street",
+    "city",
+    "zip_code",
+    "country",
+    "latitude",
+    "longitude",
+    "place",
+    "description",
+    "url",
+    "ticket_url",
+]
+PLACE_FIELDS = {
+    "street": "street",
+    "city": "city",
+    "zip_code": "zip",
+    "country": "country",
+    "latitude": "latitude",
+    "longitude": "longitude",
+}
+
+
+def parse_graph_datetime(value):
+    """Parse a Graph datetime string such as ``2024-05-01T20:00:00+0000``."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # Python < 3.11 does not accept offsets without a colon.
+        pass
+    try:
+        return datetime.strptime(value, GRAPH_DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def convert_description(description: str) -> str:
+    """Turn URLs into links and newlines into line breaks."""
+    description = URL_PATTERN.sub(r'<a href="\1" target="_blank">\1</a>', description)
+    return description.replace("\n", "<br>")
+
+
+class EventTransformer:
+    """Converts pages of Graph events into model field values in one pass.
+
+    A fast alternative to validating every event with the DRF serializer:
+    the model fields are looked up once, when the transformer is created,
+    and every value is checked with its model field's own ``clean``.
+    """
+
+    def __init__(self, model=None):
+        self.model = model or get_event_model()
+        self.fields = {name: self.model._meta.get_field(name) for name in ROW_FIELDS}
+
+    def transform_many(
+        self, events: List[Dict[str, Any]]
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, List[str]]]]:
+        """Returns the valid rows and the errors of the invalid events, by position."""
+        rows, errors = {}, {}
+        for index, event in enumerate(events):
+            row, row_errors = self.transform(event)
+            if row_errors:
+                errors[index] = row_errors
+            else:
+                rows[index] = row
+        return rows, errors
+
+    def transform(self, event: Dict[str, Any]):
+        row = self.convert(event)
+        errors = {}
+        for name, value in row.items():
+            field = self.fields[name]
+            # The image is created by the importer itself.
+            if field.is_relation or (value is None and field.null):
+                continue
+            try:
+                row[name] = field.clean(value, None)
+            except ValidationError as e:
+                errors[field.name] = e.messages
+        return row, errors
+
+    @staticmethod
+    def convert(event: Dict[str, Any]) -> Dict[str, Any]:
+        """Maps a Graph event onto model fields like the serializer's transform_data."""
+        row = {
+            "facebook_id": event.get("id"),
+            "hashed": event.get("hashed"),
+            "url": f"https://www.facebook.com/events/{event.get('id')}/",
+            "ticket_url": event.get("ticket_uri"),
+        }
+        if "name" in event:
+            row["name"] = event["name"]
+        if "start_time" in event:
+            start_datetime = parse_graph_datetime(event["start_time"])
+            if start_datetime:
+                row["date"] = start_datetime.date()
+                row["start_time"] = start_datetime.time()
+            else:
+                row["start_time"] = event["start_time"]
+        if "end_time" in event:
+            end_datetime = parse_graph_datetime(event["end_time"])
+            row["end_time"] = end_datetime.time() if end_datetime else event["end_time"]
+        if "description" in event:
+            description = event["description"]
+            row["description"] = (
+                convert_description(description) if description else description
+            )
+        if "place" in event:
+            place = event["place"]
+            row["place"] = place
+            if place:
+                location = place.get("location", {})
+                row["venue"] = place.get("name")
+                for field, key in PLACE_FIELDS.items():
+                    row[field] = location.get(key)
+        if "image" in event:
+            row["image_id"] = event["image"]
+        return row
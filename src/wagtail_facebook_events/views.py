@@ -1,12 +1,36 @@
-from django.http import HttpResponse
+from django.http import JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
+from wagtail.admin.views.generic.base import WagtailAdminTemplateMixin
+from wagtail_facebook_events.progress import ImportProgress
 from wagtail_facebook_events.service import FacebookEventsImporterService
 
 
-class ImportEventsView(TemplateView):
-    """View to import events from Facebook."""
+class ImportEventsView(WagtailAdminTemplateMixin, TemplateView):
+    """Admin page to start importing events from Facebook in the background.
 
-    def get(self, request):
+    The page posts to itself to start the import, then polls the status view
+    until the import is no longer running.
+    """
+
+    page_title = "Import Events"
+    header_icon = "date"
+    template_name = "wagtail_facebook_events/import_events.html"
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(status=ImportProgress().get(), **kwargs)
+
+    def post(self, request):
         service = FacebookEventsImporterService()
-        service.import_events()
-        return HttpResponse(service.import_events())
+        started = service.start_import()
+        return JsonResponse(
+            {"started": started, **service.progress.get()},
+            status=202 if started else 409,
+        )
+
+
+class ImportStatusView(View):
+    """View reporting the status and progress of the latest import."""
+
+    def get(self, request):
+        return JsonResponse(ImportProgress().get())
@@ -1,13 +1,18 @@
-from django.urls import path
+from django.urls import path, reverse
 from wagtail import hooks
 from wagtail.admin.menu import MenuItem
-from wagtail_facebook_events.views import ImportEventsView
+from wagtail_facebook_events.views import ImportEventsView, ImportStatusView
 
 
 @hooks.register("register_admin_urls")
 def register_admin_urls():
     return [
         path("import-events/", ImportEventsView.as_view(), name="import_events"),
+        path(
+            "import-events/status/",
+            ImportStatusView.as_view(),
+            name="import_events_status",
+        ),
     ]
 
 
@@ -15,7 +20,7 @@ def register_admin_urls():
 def register_import_events_menu_item():
     return MenuItem(
         "Import Events",
-        "/admin/import-events/",
+        reverse("import_events"),
         icon_name="date",
         order=10000,
     )
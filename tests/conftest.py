@@ -0,0 +1,17 @@
+import sys
+
+
+def pytest_terminal_summary(terminalreporter):
+    # Only report when the benchmarks ran; importing them here would make
+    # every test run depend on their imports.
+    import_benchmark = sys.modules.get("import_benchmark")
+    if import_benchmark is None or not import_benchmark.results:
+        return
+    terminalreporter.section("import benchmarks")
+    for line in import_benchmark.format_results(import_benchmark.results):
+        terminalreporter.write_line(line)
+    if import_benchmark.OUTPUT:
+        import_benchmark.write_results(
+            import_benchmark.OUTPUT, import_benchmark.results
+        )
+        terminalreporter.write_line(f"Results written to {import_benchmark.OUTPUT}")
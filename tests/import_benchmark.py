@@ -0,0 +1,207 @@
+"""Benchmarks of the import pipeline, shared by ``test_benchmarks.py``.
+
+Every importer is driven through its real API client against a
+``FakeGraphTransport`` serving the events of a seeded ``FakeEventGenerator``
+and their cover images, so runs are comparable. The size of
+a run is set with environment variables:
+
+``FACEBOOK_EVENTS_BENCHMARK_EVENTS``
+    Comma separated event counts, e.g. ``200,5000``.
+``FACEBOOK_EVENTS_BENCHMARK_CHANGE_RATIOS``
+    Comma separated fractions of the events that change between the
+    initial import and the re-import, e.g. ``0,0.1,1``.
+``FACEBOOK_EVENTS_BENCHMARK_OUTPUT``
+    Path of a JSON file to write the results to, for comparing runs.
+
+The benchmarks are skipped by default; run them with ``-m benchmark``, and
+the results are printed at the end of the test session.
+Peak memory is traced with ``tracemalloc``, which slows the runs down, so
+compare wall times between runs of the suite rather than with production.
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import List
+from unittest import mock
+
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+from wagtail_facebook_events.api_clients.fake import GRAPH_PATH, FakeGraphTransport
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.asynchronous import (
+    FacebookEventsImporterAsync,
+)
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+
+EVENT_COUNTS = [
+    int(count)
+    for count in os.environ.get("FACEBOOK_EVENTS_BENCHMARK_EVENTS", "100").split(",")
+]
+CHANGE_RATIOS = [
+    float(ratio)
+    for ratio in os.environ.get(
+        "FACEBOOK_EVENTS_BENCHMARK_CHANGE_RATIOS", "0,0.1,1"
+    ).split(",")
+]
+OUTPUT = os.environ.get("FACEBOOK_EVENTS_BENCHMARK_OUTPUT")
+
+# The Celery importer is only benchmarked where Celery is installed.
+IMPORTERS = ["sync", "async"] + (
+    ["celery"] if importlib.util.find_spec("celery") else []
+)
+
+# Results of the benchmarks in this session, reported by conftest.py.
+results: List["BenchmarkResult"] = []
+
+
+@dataclass
+class BenchmarkResult:
+    importer: str
+    events: int
+    change_ratio: float
+    phase: str
+    seconds: float
+    pages_fetched: int
+    queries: int
+    peak_memory_kib: int
+    images_downloaded: int
+    imported: int
+
+
+def image_requests(transport: FakeGraphTransport) -> int:
+    return sum(
+        1 for request in transport.requests if not GRAPH_PATH.match(request.url.path)
+    )
+
+
+def listing_requests(transport: FakeGraphTransport) -> int:
+    return sum(
+        1 for request in transport.requests if request.url.path.endswith("/events")
+    )
+
+
+class QueryCounter(logging.Handler):
+    """Counts the SQL queries logged by Django on every thread."""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        if getattr(record, "sql", None) is not None:
+            self.count += 1
+
+
+@contextmanager
+def count_queries():
+    """Counts queries in every thread, including the async ORM's executor."""
+    counter = QueryCounter()
+    db_logger = logging.getLogger("django.db.backends")
+    level, propagate = db_logger.level, db_logger.propagate
+    db_logger.setLevel(logging.DEBUG)
+    db_logger.propagate = False
+    db_logger.addHandler(counter)
+    try:
+        with override_settings(DEBUG=True):
+            yield counter
+    finally:
+        db_logger.removeHandler(counter)
+        db_logger.setLevel(level)
+        db_logger.propagate = propagate
+
+
+def run_importer(name: str, transport: FakeGraphTransport) -> List[str]:
+    """Runs a full sync with the named importer and returns the imported ids."""
+    http = HTTPClientPool(transport=transport, async_transport=transport)
+    if name == "sync":
+        return FacebookEventsImporterSync(full_sync=True, http=http).import_events()
+    if name == "async":
+        return asyncio.run(
+            FacebookEventsImporterAsync(full_sync=True, http=http).import_events()
+        )
+    from celery import current_app
+
+    from wagtail_facebook_events.importers import celery as celery_importer
+
+    # The Celery tasks run eagerly, in this process, against the same transport.
+    always_eager = current_app.conf.task_always_eager
+    current_app.conf.task_always_eager = True
+    try:
+        with mock.patch.object(
+            celery_importer,
+            "HTTPClientPool",
+            lambda: HTTPClientPool(transport=transport),
+        ):
+            result = celery_importer.CeleryFacebookEventsImporter(
+                full_sync=True, http=http
+            ).import_events()
+        return result.get()["imported"]
+    finally:
+        current_app.conf.task_always_eager = always_eager
+
+
+def measure(name, transport, events, change_ratio, phase) -> BenchmarkResult:
+    """Runs an importer once, measuring its wall time, queries and memory."""
+    # Covers are cached across runs; every run starts without that cache.
+    for alias in caches:
+        caches[alias].clear()
+    images_before = image_requests(transport)
+    listings_before = listing_requests(transport)
+    with count_queries() as counter:
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        imported_ids = run_importer(name, transport)
+        seconds = time.perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result = BenchmarkResult(
+        importer=name,
+        events=events,
+        change_ratio=change_ratio,
+        phase=phase,
+        seconds=round(seconds, 3),
+        pages_fetched=listing_requests(transport) - listings_before,
+        queries=counter.count,
+        peak_memory_kib=peak_memory // 1024,
+        images_downloaded=image_requests(transport) - images_before,
+        imported=len(imported_ids),
+    )
+    results.append(result)
+    return result
+
+
+def format_results(benchmark_results: List[BenchmarkResult]) -> List[str]:
+    columns = [
+        "importer",
+        "events",
+        "change_ratio",
+        "phase",
+        "seconds",
+        "pages_fetched",
+        "queries",
+        "peak_memory_kib",
+        "images_downloaded",
+        "imported",
+    ]
+    rows = [columns] + [
+        [str(getattr(result, column)) for column in columns]
+        for result in benchmark_results
+    ]
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+    return [
+        "  ".join(value.rjust(width) for value, width in zip(row, widths))
+        for row in rows
+    ]
+
+
+def write_results(path: str, benchmark_results: List[BenchmarkResult]):
+    with open(path, "w") as output:
+        json.dump([asdict(result) for result in benchmark_results], output, indent=2)
@@ -0,0 +1,136 @@
+import json
+
+import httpx
+import pytest
+
+from wagtail_facebook_events.api_clients import asynchronous, fields_query, sync
+from wagtail_facebook_events.api_clients.fake import FakeGraphTransport
+from wagtail_facebook_events.api_clients.page_size import AdaptivePageSize
+from wagtail_facebook_events.api_clients.throttle import GraphThrottle
+from wagtail_facebook_events.http import HTTPClientPool
+
+
+@pytest.fixture
+def transport():
+    return FakeGraphTransport()
+
+
+def test_batch_packs_requests_into_one_round_trip(transport):
+    api = sync.FacebookEventsAPI(http=HTTPClientPool(transport=transport))
+
+    events = api.get_events(["1", "2", "3"])
+
+    assert len(transport.requests) == 1
+    assert [event["id"] for event in events.values()] == ["1", "2", "3"]
+
+
+def test_batch_splits_at_the_graph_batch_limit(transport):
+    api = sync.FacebookEventsAPI(http=HTTPClientPool(transport=transport))
+
+    covers = api.get_covers([str(event_id) for event_id in range(120)])
+
+    assert len(transport.requests) == 3
+    assert len(covers) == 120
+    assert all(cover["source"] for cover in covers.values())
+
+
+@pytest.mark.asyncio
+async def test_async_batch_fetches_several_pages(transport):
+    http = HTTPClientPool(async_transport=transport)
+    api = asynchronous.FacebookEventsAPI(http=http)
+
+    pages = await api.get_pages(["page-1", "page-2"], limit=5)
+    await http.aclose()
+
+    assert len(transport.requests) == 1
+    assert [len(page["data"]) for page in pages.values()] == [5, 5]
+
+
+def rate_limited_transport(failures):
+    """Fails the first ``failures`` requests with Graph error 17."""
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        if len(requests) <= failures:
+            return httpx.Response(
+                400, json={"error": {"code": 17, "message": "User request limit"}}
+            )
+        usage = {"call_count": 90, "total_cputime": 10, "total_time": 20}
+        return httpx.Response(
+            200, json={"data": []}, headers={"X-App-Usage": json.dumps(usage)}
+        )
+
+    return httpx.MockTransport(handle), requests
+
+
+def test_rate_limit_errors_are_retried_and_usage_is_tracked():
+    transport, requests = rate_limited_transport(failures=2)
+    throttle = GraphThrottle(backoff_base=0, slowdown_at=80, max_delay=2)
+    api = sync.FacebookEventsAPI(
+        http=HTTPClientPool(transport=transport), throttle=throttle
+    )
+
+    assert api.get() == {"data": []}
+    assert len(requests) == 3
+    assert throttle.usage == 90
+    assert throttle.delay() == pytest.approx(1.0)
+
+
+def test_retries_give_up_after_the_configured_attempts():
+    transport, requests = rate_limited_transport(failures=10)
+    api = sync.FacebookEventsAPI(
+        http=HTTPClientPool(transport=transport),
+        throttle=GraphThrottle(backoff_base=0),
+    )
+    api.retry_attempts = 2
+
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get()
+    assert len(requests) == 3
+
+
+def test_fields_query_supports_nested_projections():
+    fields = ["name", "cover{id,source}", {"place": ["name", {"location": ["city"]}]}]
+
+    assert fields_query(fields) == "name,cover{id,source},place{name,location{city}}"
+
+
+def test_page_size_grows_on_fast_pages_and_shrinks_when_refused(transport):
+    api = sync.FacebookEventsAPI(http=HTTPClientPool(transport=transport))
+    api.page_size = AdaptivePageSize(initial=10, minimum=5, maximum=40)
+
+    api.get()
+    assert api.page_size.limit == 20
+
+    def refuse_large_pages(request):
+        if int(request.url.params["limit"]) > 5:
+            return httpx.Response(
+                500,
+                json={
+                    "error": {
+                        "code": 1,
+                        "message": "Please reduce the amount of data you're asking for",
+                    }
+                },
+            )
+        return transport.handle(request)
+
+    api.http = HTTPClientPool(transport=httpx.MockTransport(refuse_large_pages))
+    page = api.get()
+
+    assert len(page["data"]) == 5
+    assert api.page_size.limit == 10
+
+
+def test_page_size_ignores_throttle_pauses(transport, monkeypatch):
+    throttle = GraphThrottle(backoff_base=0)
+    monkeypatch.setattr(throttle, "delay", lambda: 0.3)
+    api = sync.FacebookEventsAPI(
+        http=HTTPClientPool(transport=transport), throttle=throttle
+    )
+    api.page_size = AdaptivePageSize(initial=10, maximum=40, target_seconds=0.2)
+
+    api.get()
+
+    assert api.page_size.limit == 20
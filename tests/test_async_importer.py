@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeGraphTransport,
+)
+from wagtail_facebook_events.fingerprint import fingerprint, legacy_fingerprint
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.asynchronous import (
+    FacebookEventsImporterAsync,
+)
+
+Event = get_event_model()
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@pytest.mark.parametrize("prefetch_depth", [1, 3])
+def test_pages_are_prefetched_into_a_bounded_queue(prefetch_depth):
+    transport = FakeGraphTransport(pages=6)
+    importer = FacebookEventsImporterAsync(
+        full_sync=True,
+        prefetch_depth=prefetch_depth,
+        http=HTTPClientPool(async_transport=transport),
+    )
+    importer.events_api.page_size = None
+    process_page = importer.processor.process_page
+    queued = []
+
+    async def slow_process_page(page):
+        await asyncio.sleep(0.05)
+        # Pages fetched and waiting in the queue once this one is processed.
+        queued.append(importer.stats["pages"] - len(queued) - 1)
+        return await process_page(page)
+
+    importer.processor.process_page = slow_process_page
+
+    imported_ids = asyncio.run(importer.import_events())
+
+    assert len(imported_ids) == Event.objects.count() == 150
+    assert len(queued) == importer.stats["pages"] == 6
+    # Fetching runs ahead of the slow processing, but only up to the depth.
+    assert max(queued) == prefetch_depth
+    assert importer.stats["fetch_wait_seconds"] > 0
+    assert importer.stats["process_seconds"] > 0
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_sharded_sync_fetches_every_window_and_deduplicates():
+    transport = FakeGraphTransport(pages=2)
+    importer = FacebookEventsImporterAsync(
+        full_sync=True, shards=3, http=HTTPClientPool(async_transport=transport)
+    )
+    importer.events_api.page_size = None
+
+    imported_ids = asyncio.run(importer.import_events())
+
+    # The fake returns the same ids in every window; each is imported once.
+    assert sorted(imported_ids, key=int) == [str(i) for i in range(1, 51)]
+    windows = {
+        (request.url.params.get("since"), request.url.params.get("until"))
+        for request in transport.requests
+        if request.url.path.endswith("/events")
+    }
+    assert len(windows) == 3
+    assert (None, None) not in windows
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@pytest.mark.parametrize("upsert", [False, True])
+def test_changed_events_are_written_with_the_async_orm(upsert):
+    generator = FakeEventGenerator(count=50)
+
+    def run_import():
+        importer = FacebookEventsImporterAsync(
+            full_sync=True,
+            http=HTTPClientPool(
+                async_transport=FakeGraphTransport(pages=None, generator=generator)
+            ),
+        )
+        importer.events_api.page_size = None
+        importer.processor.upsert_mode = upsert
+        return asyncio.run(importer.import_events())
+
+    run_import()
+    changed_ids = generator.change(0.2)
+    Event.objects.filter(facebook_id__in=changed_ids).update(name="Stale")
+
+    imported_ids = run_import()
+
+    assert sorted(imported_ids, key=int) == changed_ids
+    assert Event.objects.count() == 50
+    assert not Event.objects.filter(name="Stale").exists()
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_legacy_fingerprints_are_upgraded_when_the_page_is_flushed():
+    transport = FakeGraphTransport()
+    http = HTTPClientPool(async_transport=transport)
+    asyncio.run(FacebookEventsImporterAsync(http=http).import_events())
+    events = transport.generator.events()[:25]
+    for event in events:
+        Event.objects.filter(facebook_id=event["id"]).update(
+            hashed=legacy_fingerprint(event)
+        )
+
+    importer = FacebookEventsImporterAsync(http=http)
+    assert asyncio.run(importer.import_events()) == []
+
+    assert dict(Event.objects.values_list("facebook_id", "hashed")) == {
+        event["id"]: fingerprint(event) for event in events
+    }
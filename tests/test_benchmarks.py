@@ -0,0 +1,41 @@
+import pytest
+
+from import_benchmark import (
+    CHANGE_RATIOS,
+    EVENT_COUNTS,
+    IMPORTERS,
+    measure,
+)
+from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeGraphTransport,
+)
+
+Event = get_event_model()
+
+# Storing a page may take a few queries and a cover image one; anything that
+# issues queries per event exceeds this budget.
+QUERIES_PER_PAGE = 8
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@pytest.mark.parametrize("change_ratio", CHANGE_RATIOS)
+@pytest.mark.parametrize("events", EVENT_COUNTS)
+@pytest.mark.parametrize("importer", IMPORTERS)
+def test_import_benchmark(importer, events, change_ratio):
+    generator = FakeEventGenerator(count=events)
+    transport = FakeGraphTransport(pages=None, generator=generator)
+
+    initial = measure(importer, transport, events, change_ratio, "initial")
+    changed_ids = generator.change(change_ratio)
+    reimport = measure(importer, transport, events, change_ratio, "reimport")
+
+    assert initial.imported == initial.images_downloaded == events
+    assert reimport.imported == reimport.images_downloaded == len(changed_ids)
+    assert Event.objects.count() == events
+    for result in (initial, reimport):
+        assert result.queries <= (
+            QUERIES_PER_PAGE * result.pages_fetched + result.images_downloaded + 10
+        )
@@ -0,0 +1,90 @@
+import httpx
+import pytest
+
+from wagtail_facebook_events import get_event_model, get_sync_cursor_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeGraphTransport,
+)
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.transformers import parse_graph_datetime
+
+current_app = pytest.importorskip("celery").current_app
+
+from wagtail_facebook_events.importers import celery as celery_importer  # noqa: E402
+
+Event = get_event_model()
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = FakeGraphTransport(pages=3)
+    monkeypatch.setattr(
+        celery_importer, "HTTPClientPool", lambda: HTTPClientPool(transport=transport)
+    )
+    monkeypatch.setattr(current_app.conf, "task_always_eager", True)
+    return transport
+
+
+@pytest.mark.django_db
+def test_celery_importer_fans_out_page_cursors(transport):
+    importer = celery_importer.CeleryFacebookEventsImporter(
+        full_sync=True,
+        page_size=10,
+        worker_batch_size=4,
+        http=HTTPClientPool(transport=transport),
+    )
+
+    result = importer.import_events().get()
+
+    assert len(result["imported"]) == 30
+    assert result["rejected"] == []
+    assert Event.objects.count() == 30
+    listings = [
+        request
+        for request in transport.requests
+        if request.url.path.endswith("/events")
+    ]
+    # Three id-only requests to collect the cursors, then one per worker.
+    assert [request.url.params["fields"] for request in listings[:3]] == ["id"] * 3
+    assert [request.url.params.get("after") for request in listings[3:]] == [
+        None,
+        "1",
+        "2",
+    ]
+
+
+@pytest.mark.django_db
+def test_sync_cursor_stops_before_rejected_events(monkeypatch):
+    generator = FakeEventGenerator(count=6)
+    fake = FakeGraphTransport(pages=None, generator=generator)
+
+    def handle(request):
+        response = fake.handle(request)
+        if not request.url.path.endswith("/events"):
+            return response
+        body = response.json()
+        for event in body["data"]:
+            if event["id"] == "4":
+                event["ticket_uri"] = "not a url"
+        return httpx.Response(200, json=body)
+
+    transport = httpx.MockTransport(handle)
+    monkeypatch.setattr(
+        celery_importer, "HTTPClientPool", lambda: HTTPClientPool(transport=transport)
+    )
+    monkeypatch.setattr(current_app.conf, "task_always_eager", True)
+    importer = celery_importer.CeleryFacebookEventsImporter(
+        incremental=True,
+        full_sync=True,
+        page_size=3,
+        http=HTTPClientPool(transport=transport),
+    )
+
+    result = importer.import_events().get()
+
+    assert result["rejected"] == ["4"]
+    sync_cursor = get_sync_cursor_model().objects.get()
+    assert sync_cursor.last_updated_time < parse_graph_datetime(
+        generator.event(3)["updated_time"]
+    )
@@ -0,0 +1,71 @@
+import pytest
+
+from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeFacebookEventsAPI,
+    FakeGraphServer,
+    FakeGraphTransport,
+)
+from wagtail_facebook_events.api_clients.throttle import GraphThrottle
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+
+Event = get_event_model()
+
+
+def test_generator_is_seeded_and_ids_are_unique():
+    generator = FakeEventGenerator(count=100_000)
+
+    events = generator.events()
+
+    assert len({event["id"] for event in events}) == 100_000
+    assert FakeEventGenerator(count=10).events() == events[:10]
+    assert FakeEventGenerator(count=10, seed=1).events() != events[:10]
+
+
+def test_change_edits_the_given_share_of_events():
+    generator = FakeEventGenerator(count=200)
+    before = {event["id"]: event for event in generator.events()}
+
+    changed_ids = generator.change(0.25)
+
+    after = {event["id"]: event for event in generator.events()}
+    assert len(changed_ids) == 50
+    assert [
+        event_id for event_id in before if before[event_id] != after[event_id]
+    ] == changed_ids
+    assert all(
+        after[event_id]["updated_time"] > before[event_id]["updated_time"]
+        for event_id in changed_ids
+    )
+
+
+def test_fake_api_follows_real_paging_cursors():
+    api = FakeFacebookEventsAPI(generator=FakeEventGenerator(count=60))
+
+    events_page = api.get(limit=25)
+    events = list(events_page["data"])
+    while events_page.get("paging", {}).get("next"):
+        events_page = api.fetch_next_page(events_page["paging"]["next"])
+        events.extend(events_page["data"])
+
+    assert [event["id"] for event in events] == [str(i) for i in range(1, 61)]
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_importer_runs_against_the_local_server_with_injected_errors():
+    transport = FakeGraphTransport(pages=None, generator=FakeEventGenerator(count=40))
+    with FakeGraphServer(transport, latency=(0, 0.005), error_rate=0.2) as server:
+        importer = FacebookEventsImporterSync(full_sync=True, http=HTTPClientPool())
+        importer.events_api.graph_url = server.graph_url
+        importer.events_api.throttle = GraphThrottle(backoff_base=0)
+
+        imported_ids = importer.import_events()
+
+        assert sorted(imported_ids, key=int) == [str(i) for i in range(1, 41)]
+    assert server.errors > 0
+    # The covers were downloaded from the server too.
+    assert any(
+        request.url.path.startswith("/covers/") for request in transport.requests
+    )
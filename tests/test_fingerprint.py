@@ -0,0 +1,42 @@
+from wagtail_facebook_events.fingerprint import (
+    fingerprint,
+    is_legacy_fingerprint,
+    legacy_fingerprint,
+)
+
+EVENT = {
+    "id": "1",
+    "name": "Concert",
+    "start_time": "2024-05-01T20:00:00+0000",
+    "place": {"name": "Venue", "location": {"city": "Utrecht", "zip": "3511"}},
+    "cover": {"id": "9", "source": "https://cdn.example.com/9.jpg"},
+}
+
+
+def test_fingerprint_ignores_key_order():
+    reordered = {
+        "cover": {"source": EVENT["cover"]["source"], "id": "9"},
+        "place": {"location": {"zip": "3511", "city": "Utrecht"}, "name": "Venue"},
+        "start_time": EVENT["start_time"],
+        "name": "Concert",
+        "id": "1",
+    }
+
+    assert fingerprint(reordered) == fingerprint(EVENT)
+    assert len(fingerprint(EVENT)) == 32
+
+
+def test_fingerprint_covers_nested_fields():
+    new_cover = dict(EVENT, cover={"id": "10", "source": EVENT["cover"]["source"]})
+    new_source = dict(EVENT, cover={"id": "9", "source": "https://cdn.example.com/x"})
+
+    assert fingerprint(new_cover) != fingerprint(EVENT)
+    assert fingerprint(new_source) == fingerprint(EVENT)
+    assert fingerprint(new_source, fields=["cover.source"]) != fingerprint(
+        EVENT, fields=["cover.source"]
+    )
+
+
+def test_legacy_fingerprints_are_recognised():
+    assert is_legacy_fingerprint(legacy_fingerprint(EVENT))
+    assert not is_legacy_fingerprint(fingerprint(EVENT))
@@ -0,0 +1,67 @@
+import asyncio
+from unittest import mock
+
+import httpx
+import pytest
+
+from wagtail_facebook_events.api_clients.fake import FakeGraphTransport
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.asynchronous import (
+    FacebookEventsImporterAsync,
+)
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+
+
+@pytest.mark.django_db
+def test_importer_requests_share_one_pooled_client():
+    transport = FakeGraphTransport(pages=2)
+    http = HTTPClientPool(transport=transport)
+    importer = FacebookEventsImporterSync(full_sync=True, http=http)
+
+    assert importer.events_api.http is http
+    assert importer.processor.http is http
+    assert importer.processor.image_processor.http is http
+    client = http.client
+    with mock.patch.object(httpx, "Client", wraps=httpx.Client) as client_class:
+        importer.import_events()
+
+    # No other client was created: listings and covers used the pooled one.
+    assert client_class.call_count == 0
+    assert any(request.url.path.endswith(".gif") for request in transport.requests)
+    # The pool was passed in, so the caller closes it.
+    assert http._client is client
+    assert not client.is_closed
+
+
+@pytest.mark.django_db
+def test_importer_closes_the_pool_it_created():
+    importer = FacebookEventsImporterSync()
+    importer.http.transport = FakeGraphTransport()
+    client = importer.http.client
+
+    importer.import_events()
+
+    assert client.is_closed
+    assert importer.http._client is None
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_async_importer_closes_only_the_pool_it_created():
+    transport = FakeGraphTransport()
+    shared = HTTPClientPool(async_transport=transport)
+    shared_importer = FacebookEventsImporterAsync(http=shared)
+    owning_importer = FacebookEventsImporterAsync()
+    owning_importer.http.async_transport = transport
+
+    async def run_imports():
+        clients = shared.async_client, owning_importer.http.async_client
+        await shared_importer.import_events()
+        await owning_importer.import_events()
+        return clients
+
+    shared_client, owned_client = asyncio.run(run_imports())
+
+    assert owned_client.is_closed
+    assert owning_importer.http._async_client is None
+    assert shared._async_client is shared_client
+    assert not shared_client.is_closed
@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import httpx
+import pytest
+from django.core.cache import cache
+from wagtail.images import get_image_model
+
+from wagtail_facebook_events.api_clients.fake import PIXEL_GIF
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.processors.image import (
+    AsyncEventImageProcessor,
+    EventImageProcessor,
+)
+
+ImageModel = get_image_model()
+
+CHUNK = b"x" * 1024
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def cover_event(event_id, host="cdn"):
+    return {
+        "id": event_id,
+        "name": f"Event {event_id}",
+        "cover": {"id": event_id, "source": f"https://{host}/{event_id}.gif"},
+    }
+
+
+class InFlight:
+    """Tracks the most downloads in flight at once, overall and per host."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = Counter()
+        self.peak = Counter()
+
+    def enter(self, host):
+        with self.lock:
+            for key in (host, "all"):
+                self.current[key] += 1
+                self.peak[key] = max(self.peak[key], self.current[key])
+
+    def exit(self, host):
+        with self.lock:
+            for key in (host, "all"):
+                self.current[key] -= 1
+
+
+def cover_response(request):
+    if request.url.path == "/broken.gif":
+        return httpx.Response(500)
+    return httpx.Response(200, content=PIXEL_GIF)
+
+
+def unsized_transport(chunks):
+    """Streams ``chunks`` KiB without a Content-Length; counts the chunks sent."""
+    sent = []
+
+    def body():
+        for _ in range(chunks):
+            sent.append(CHUNK)
+            yield CHUNK
+
+    async def abody():
+        for chunk in body():
+            yield chunk
+
+    def handle(request):
+        return httpx.Response(200, content=body())
+
+    async def ahandle(request):
+        return httpx.Response(200, content=abody())
+
+    return httpx.MockTransport(handle), httpx.MockTransport(ahandle), sent
+
+
+def oversized_transport():
+    """Announces a cover larger than any limit in its Content-Length."""
+    return httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, content=PIXEL_GIF, headers={"Content-Length": str(10**9)}
+        )
+    )
+
+
+def download(processor, event):
+    if isinstance(processor, AsyncEventImageProcessor):
+        return asyncio.run(processor.download(event))
+    return processor.download(event)
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@pytest.mark.parametrize(
+    "processor_class", [EventImageProcessor, AsyncEventImageProcessor]
+)
+def test_covers_announced_as_too_large_are_not_downloaded(processor_class):
+    transport = oversized_transport()
+    processor = processor_class(
+        http=HTTPClientPool(transport=transport, async_transport=transport),
+        max_bytes=4 * 1024,
+    )
+
+    assert download(processor, cover_event("1")) is None
+    assert not ImageModel.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@pytest.mark.parametrize(
+    "processor_class", [EventImageProcessor, AsyncEventImageProcessor]
+)
+def test_covers_of_unknown_length_are_abandoned_past_the_limit(processor_class):
+    transport, async_transport, sent = unsized_transport(chunks=100)
+    processor = processor_class(
+        http=HTTPClientPool(transport=transport, async_transport=async_transport),
+        chunk_size=1024,
+        max_bytes=4 * 1024,
+    )
+
+    assert download(processor, cover_event("1")) is None
+    assert not ImageModel.objects.exists()
+    # The stream is closed once the limit is passed, not read to the end.
+    assert len(sent) < 10
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_async_downloads_stay_within_the_global_and_per_host_limits():
+    in_flight = InFlight()
+
+    async def handle(request):
+        in_flight.enter(request.url.host)
+        await asyncio.sleep(0.01)
+        in_flight.exit(request.url.host)
+        return cover_response(request)
+
+    processor = AsyncEventImageProcessor(
+        http=HTTPClientPool(async_transport=httpx.MockTransport(handle)),
+        concurrency=4,
+        per_host=2,
+    )
+    events = [
+        cover_event(f"{host}-{index}", host) for host in "abc" for index in range(6)
+    ]
+    events[0]["cover"]["source"] = "https://a/broken.gif"
+
+    async def download_all():
+        return await asyncio.gather(*[processor.download(event) for event in events])
+
+    image_pks = asyncio.run(download_all())
+
+    assert in_flight.peak["all"] == 4
+    assert max(in_flight.peak[host] for host in "abc") == 2
+    # The failed download does not affect the others.
+    assert image_pks[0] is None
+    assert all(image_pk is not None for image_pk in image_pks[1:])
+
+
+@pytest.mark.django_db
+def test_threaded_downloads_stay_within_the_pool_and_survive_a_failure():
+    in_flight = InFlight()
+
+    def handle(request):
+        in_flight.enter(request.url.host)
+        time.sleep(0.01)
+        in_flight.exit(request.url.host)
+        return cover_response(request)
+
+    processor = EventImageProcessor(
+        http=HTTPClientPool(transport=httpx.MockTransport(handle)), threads=3
+    )
+    events = [cover_event(str(index)) for index in range(12)]
+    events[5]["cover"]["source"] = "https://cdn/broken.gif"
+
+    image_pks = processor.download_many(events)
+
+    assert 1 < in_flight.peak["all"] <= 3
+    assert image_pks[5] is None
+    assert all(image_pk is not None for image_pk in image_pks[:5] + image_pks[6:])
+    assert ImageModel.objects.count() == 1
@@ -0,0 +1,156 @@
+import asyncio
+import inspect
+from datetime import timedelta
+
+import httpx
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from wagtail_facebook_events import get_event_model, get_sync_cursor_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeGraphTransport,
+)
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.asynchronous import (
+    FacebookEventsImporterAsync,
+)
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+from wagtail_facebook_events.settings import INCREMENTAL_SYNC_OVERLAP
+from wagtail_facebook_events.transformers import parse_graph_datetime
+
+Event = get_event_model()
+try:
+    SyncCursor = get_sync_cursor_model()
+except ImproperlyConfigured:
+    pytest.skip("no sync cursor model configured", allow_module_level=True)
+
+importer_classes = pytest.mark.parametrize(
+    "importer_class", [FacebookEventsImporterSync, FacebookEventsImporterAsync]
+)
+
+
+def incremental_importer(importer_class, transport):
+    """Returns an incremental importer that records the ids of processed events."""
+    importer = importer_class(
+        incremental=True,
+        http=HTTPClientPool(transport=transport, async_transport=transport),
+    )
+    importer.processed_ids = []
+    process_page = importer.processor.process_page
+
+    def record_page(page):
+        importer.processed_ids.extend(event["id"] for event in page["data"])
+        return process_page(page)
+
+    importer.processor.process_page = record_page
+    return importer
+
+
+def run(importer):
+    result = importer.import_events()
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+
+def invalid_events_transport(generator, invalid_ids):
+    """Serves the generator's events, making ``invalid_ids`` fail validation."""
+    fake = FakeGraphTransport(pages=None, generator=generator)
+
+    def handle(request):
+        response = fake.handle(request)
+        if not request.url.path.endswith("/events"):
+            return response
+        body = response.json()
+        for event in body["data"]:
+            if event["id"] in invalid_ids:
+                event["ticket_uri"] = "not a url"
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handle)
+
+
+@pytest.mark.django_db
+def test_rejected_events_are_retried_on_the_next_incremental_import():
+    generator = FakeEventGenerator(count=5)
+    invalid_ids = {"3"}
+
+    def run_import():
+        return FacebookEventsImporterSync(
+            incremental=True,
+            full_sync=True,
+            http=HTTPClientPool(
+                transport=invalid_events_transport(generator, invalid_ids)
+            ),
+        ).import_events()
+
+    assert sorted(run_import()) == ["1", "2", "4", "5"]
+    sync_cursor = SyncCursor.objects.get()
+    # The cursor stays before the rejected event, so it is fetched again.
+    assert sync_cursor.last_updated_time < parse_graph_datetime(
+        generator.event(2)["updated_time"]
+    )
+
+    invalid_ids.clear()
+
+    assert run_import() == ["3"]
+    assert Event.objects.count() == 5
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@importer_classes
+def test_incremental_import_fetches_events_since_the_last_run(importer_class):
+    transport = FakeGraphTransport(pages=None, generator=FakeEventGenerator(count=10))
+
+    run(incremental_importer(importer_class, transport))
+    assert "since" not in transport.requests[0].url.params
+    last_run_at = SyncCursor.objects.get().last_run_at
+    transport.requests.clear()
+    run(incremental_importer(importer_class, transport))
+
+    since = last_run_at - timedelta(seconds=INCREMENTAL_SYNC_OVERLAP)
+    assert transport.requests[0].url.params["since"] == str(int(since.timestamp()))
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@importer_classes
+def test_events_at_or_below_the_watermark_are_not_processed(importer_class):
+    generator = FakeEventGenerator(count=10)
+    transport = FakeGraphTransport(pages=None, generator=generator)
+    run(incremental_importer(importer_class, transport))
+    last_updated_time = SyncCursor.objects.get().last_updated_time
+    assert last_updated_time == max(
+        parse_graph_datetime(event["updated_time"]) for event in generator.events()
+    )
+
+    changed_ids = generator.change(0.3)
+    importer = incremental_importer(importer_class, transport)
+    imported_ids = run(importer)
+
+    assert importer.processed_ids == changed_ids
+    assert sorted(imported_ids, key=int) == changed_ids
+    assert SyncCursor.objects.get().last_updated_time > last_updated_time
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+@importer_classes
+def test_sync_cursor_only_advances_after_a_successful_flush(importer_class):
+    generator = FakeEventGenerator(count=10)
+    transport = FakeGraphTransport(pages=None, generator=generator)
+    run(incremental_importer(importer_class, transport))
+    sync_cursor = SyncCursor.objects.get()
+
+    generator.change(0.3)
+    importer = incremental_importer(importer_class, transport)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    importer.processor.bulk_update = importer.processor.abulk_update = fail
+    with pytest.raises(RuntimeError):
+        run(importer)
+
+    stored = SyncCursor.objects.get()
+    assert stored.last_run_at == sync_cursor.last_run_at
+    assert stored.last_updated_time == sync_cursor.last_updated_time
@@ -0,0 +1,222 @@
+import asyncio
+import copy
+
+import httpx
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+
+from wagtail_facebook_events import get_dead_letter_model, get_event_model
+from wagtail_facebook_events.api_clients.fake import generate_fake_events_data
+from wagtail_facebook_events.fingerprint import fingerprint, legacy_fingerprint
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.processors.asynchronous import AsyncEventsProcessor
+from wagtail_facebook_events.processors.sync import EventsProcessor
+
+Event = get_event_model()
+ImageModel = get_image_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def generate_events(num_events):
+    events = generate_fake_events_data(num_events)
+    for index, event in enumerate(events):
+        event["id"] = str(index)
+        event.pop("cover")
+    return events
+
+
+@pytest.mark.django_db
+def test_partition_page_uses_a_single_query(django_assert_num_queries):
+    processor = EventsProcessor()
+    events = generate_events(10)
+
+    with django_assert_num_queries(1):
+        create_events, update_events, _ = processor._partition_page(events)
+
+    assert len(create_events) == 10
+    assert update_events == []
+
+
+@pytest.mark.django_db
+def test_partition_page_sorts_creates_updates_and_skips():
+    processor = EventsProcessor()
+    events = generate_events(3)
+    create_events, _, _ = processor._partition_page(copy.deepcopy(events))
+    processor.bulk_create(create_events)
+
+    changed, unchanged, new = generate_events(4)[1:]
+    changed["id"], unchanged["id"], new["id"] = "0", "1", "3"
+    unchanged.update(events[1])
+    stopped = dict(events[2], name="Renamed")
+    Event.objects.filter(facebook_id="2").update(stop_import=True)
+
+    create_events, update_events, _ = processor._partition_page(
+        [changed, unchanged, stopped, new, dict(new)]
+    )
+
+    assert [event["id"] for event in create_events] == ["3"]
+    assert [instance.facebook_id for _, instance in update_events] == ["0"]
+
+
+@pytest.mark.django_db
+def test_unchanged_covers_are_downloaded_and_stored_once():
+    image_file = get_test_image_file()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=image_file.file.getvalue())
+
+    transport = httpx.MockTransport(handler)
+    processor = EventsProcessor(http=HTTPClientPool(transport=transport))
+    events = generate_events(4)
+    for event in events:
+        event["cover"] = {"id": event["id"], "source": f"https://cdn/{event['id']}"}
+
+    processor.bulk_create(processor.process_page({"data": copy.deepcopy(events)})[0])
+    for event in events:
+        event["name"] += " (updated)"
+    _, update_events, _ = processor.process_page({"data": events})
+
+    assert len(update_events) == 4
+    assert len(requests) == 4
+    assert ImageModel.objects.count() == 1
+    assert {new_data["image"] for new_data, _ in update_events} == {
+        ImageModel.objects.get().pk
+    }
+
+
+@pytest.mark.django_db
+def test_events_shared_by_concurrent_pages_are_updated_instead_of_created():
+    events = generate_events(3)
+    first = EventsProcessor(page_id="first")
+    second = EventsProcessor(page_id="second")
+    # Both pages list event 1 and classify it before either is stored.
+    first_creates, _, _ = first._partition_page(copy.deepcopy(events[:2]))
+    events[1]["name"] = "Renamed"
+    second_creates, _, _ = second._partition_page(copy.deepcopy(events[1:]))
+
+    assert first.bulk_create(first_creates) == set()
+    assert second.bulk_create(second_creates) == set()
+
+    assert dict(Event.objects.values_list("facebook_id", "source_page_id")) == {
+        "0": "first",
+        "1": "second",
+        "2": "second",
+    }
+    assert Event.objects.get(facebook_id="1").name == "Renamed"
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_async_events_shared_by_concurrent_pages_are_updated_instead_of_created():
+    events = generate_events(3)
+    first = AsyncEventsProcessor(page_id="first")
+    second = AsyncEventsProcessor(page_id="second")
+
+    async def import_pages():
+        first_creates = (await first.apartition_page(copy.deepcopy(events[:2])))[0]
+        events[1]["name"] = "Renamed"
+        second_creates = (await second.apartition_page(copy.deepcopy(events[1:])))[0]
+        return (
+            await first.abulk_create(first_creates),
+            await second.abulk_create(second_creates),
+        )
+
+    assert asyncio.run(import_pages()) == (set(), set())
+    assert Event.objects.count() == 3
+    assert Event.objects.get(facebook_id="1").name == "Renamed"
+
+
+@pytest.mark.django_db
+def test_bulk_update_writes_only_changed_columns():
+    processor = EventsProcessor()
+    events = generate_events(2)
+    processor.bulk_create(processor._partition_page(copy.deepcopy(events))[0])
+    events[0]["end_time"] = "2030-01-01T12:00:00+0000"
+    events[1]["name"] = "Renamed"
+
+    _, update_events, _ = processor._partition_page(events)
+    with CaptureQueriesContext(connection) as queries:
+        processor.bulk_update(update_events)
+
+    updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+    assert len(updates) == 2
+    assert not any('"description"' in sql or '"place"' in sql for sql in updates)
+    assert Event.objects.get(facebook_id="0").end_time.hour == 12
+    assert Event.objects.get(facebook_id="1").name == "Renamed"
+
+
+@pytest.mark.django_db
+def test_upsert_creates_and_updates_in_one_statement():
+    processor = EventsProcessor(upsert=True)
+    events = generate_events(3)
+    processor.upsert(processor._partition_page(copy.deepcopy(events))[0])
+    Event.objects.filter(facebook_id="2").update(stop_import=True)
+    for event in events:
+        event["name"] += " (updated)"
+    new = dict(generate_events(1)[0], id="3")
+
+    create_events, update_events, _ = processor._partition_page(events + [new])
+    with CaptureQueriesContext(connection) as queries:
+        processor.upsert(create_events + [data for data, _ in update_events])
+
+    assert len(queries) == 1
+    assert Event.objects.count() == 4
+    assert Event.objects.get(facebook_id="0").name.endswith(" (updated)")
+    assert not Event.objects.get(facebook_id="2").name.endswith(" (updated)")
+    assert Event.objects.get(facebook_id="2").stop_import
+
+
+@pytest.mark.django_db
+def test_legacy_fingerprints_are_upgraded_without_an_update():
+    processor = EventsProcessor()
+    events = generate_events(2)
+    processor.bulk_create(processor._partition_page(copy.deepcopy(events))[0])
+    for event in events:
+        Event.objects.filter(facebook_id=event["id"]).update(
+            hashed=legacy_fingerprint(event)
+        )
+    events[1]["name"] = "Renamed"
+
+    create_events, update_events, rehashed_events = processor._partition_page(events)
+
+    assert create_events == []
+    assert [instance.facebook_id for _, instance in update_events] == ["1"]
+    assert [instance.facebook_id for instance in rehashed_events] == ["0"]
+    # Classifying a page writes nothing; the fingerprint is upgraded on flush.
+    assert Event.objects.get(facebook_id="0").hashed == legacy_fingerprint(events[0])
+    processor.bulk_rehash(rehashed_events)
+    assert Event.objects.get(facebook_id="0").hashed == fingerprint(events[0])
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    get_dead_letter_model() is None, reason="no dead-letter model configured"
+)
+@pytest.mark.parametrize("upsert", [False, True])
+def test_invalid_events_are_dead_lettered_without_blocking_the_batch(upsert):
+    DeadLetter = get_dead_letter_model()
+    processor = EventsProcessor(upsert=upsert)
+    events = generate_events(3)
+    events[1]["ticket_uri"] = "not a url"
+    create_events, _, _ = processor._partition_page(events)
+
+    write = processor.upsert if upsert else processor.bulk_create
+    rejected_ids = write(create_events)
+
+    assert rejected_ids == {"1"}
+    assert set(Event.objects.values_list("facebook_id", flat=True)) == {"0", "2"}
+    dead_letter = DeadLetter.objects.get()
+    assert dead_letter.facebook_id == "1"
+    assert "ticket_url" in dead_letter.errors
+
+    processor.resolve_dead_letters(["1"])
+    assert not DeadLetter.objects.exists()
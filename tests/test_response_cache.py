@@ -0,0 +1,150 @@
+import asyncio
+from unittest import mock
+
+import httpx
+import pytest
+from django.core.cache import cache
+
+from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.api_clients import asynchronous
+from wagtail_facebook_events.api_clients.fake import (
+    FakeEventGenerator,
+    FakeGraphTransport,
+    generate_fake_events_data,
+)
+from wagtail_facebook_events.api_clients.response_cache import GraphResponseCache
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+
+Event = get_event_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def etag_transport(body, etag='"v1"'):
+    """Serves ``body`` with an ETag, answering 304 when the client has it."""
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+    return httpx.MockTransport(handle), requests
+
+
+def run_import(transport, **options):
+    importer = FacebookEventsImporterSync(
+        http=HTTPClientPool(transport=transport), **options
+    )
+    importer.events_api.response_cache = GraphResponseCache()
+    process_page = importer.processor.process_page
+    processed = []
+
+    def record_page(page):
+        processed.append(page)
+        return process_page(page)
+
+    importer.processor.process_page = record_page
+    importer.import_events()
+    return processed
+
+
+@pytest.mark.django_db
+def test_not_modified_pages_are_not_processed_again():
+    events = generate_fake_events_data(3)
+    for event in events:
+        event.pop("cover")
+    transport, requests = etag_transport({"data": events})
+
+    assert len(run_import(transport)) == 1
+    assert Event.objects.count() == 3
+
+    assert run_import(transport) == []
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.django_db
+def test_identical_pages_without_validators_are_not_processed_again():
+    events = generate_fake_events_data(3)
+    for event in events:
+        event.pop("cover")
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"data": events})
+    )
+
+    assert len(run_import(transport)) == 1
+    assert run_import(transport) == []
+
+
+@pytest.mark.django_db
+def test_adaptive_page_size_keeps_pages_cacheable_across_runs():
+    transport = FakeGraphTransport(pages=None, generator=FakeEventGenerator(count=60))
+
+    first_run = run_import(transport, full_sync=True)
+    second_run = run_import(transport, full_sync=True)
+
+    # Pages of the initial limit; a grown limit would fetch 25 and then 35.
+    assert [len(page["data"]) for page in first_run] == [25, 25, 10]
+    assert second_run == []
+
+
+@pytest.mark.django_db
+def test_cached_paging_links_are_replayed_with_the_current_token():
+    events = generate_fake_events_data(2)
+    for event in events:
+        event.pop("cover")
+    next_url = "https://graph.example/events?after=2&access_token=old"
+    pages = {
+        None: {"data": events[:1], "paging": {"next": next_url}},
+        "2": {"data": events[1:]},
+    }
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        etag = f'"{request.url.params.get("after")}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        body = pages[request.url.params.get("after")]
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+    transport = httpx.MockTransport(handle)
+    response = handle(httpx.Request("GET", "https://graph.example/events"))
+    entry = GraphResponseCache().page("key", None, response).cache_entry
+    assert entry["paging"] == {"next": "https://graph.example/events?after=2"}
+    requests.clear()
+
+    run_import(transport, full_sync=True, access_token="old")
+    run_import(transport, full_sync=True, access_token="new")
+
+    assert [request.url.params["access_token"] for request in requests[2:]] == [
+        "new",
+        "new",
+    ]
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_async_client_looks_up_the_response_cache_asynchronously():
+    transport, requests = etag_transport({"data": []})
+    api = asynchronous.FacebookEventsAPI(
+        http=HTTPClientPool(async_transport=transport),
+        response_cache=GraphResponseCache(),
+    )
+
+    async def fetch_twice():
+        page = await api.get()
+        await api.response_cache.astore_pages([page])
+        return await api.get()
+
+    with mock.patch.object(
+        GraphResponseCache, "lookup", side_effect=AssertionError("sync lookup")
+    ):
+        page = asyncio.run(fetch_twice())
+
+    assert page.unchanged
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
@@ -0,0 +1,140 @@
+import httpx
+import pytest
+from django.core.cache import cache
+
+from wagtail_facebook_events import get_event_model, service
+from wagtail_facebook_events.api_clients.fake import FakeGraphTransport
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+from wagtail_facebook_events.pages import PageRegistry
+
+Event = get_event_model()
+
+
+@pytest.fixture(autouse=True)
+def fake_importer(monkeypatch):
+    cache.clear()
+    transport = FakeGraphTransport(pages=2)
+    monkeypatch.setattr(
+        service,
+        "get_importer",
+        lambda **kwargs: FacebookEventsImporterSync(
+            full_sync=True, http=HTTPClientPool(transport=transport), **kwargs
+        ),
+    )
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_start_import_runs_once_in_the_background():
+    first = service.FacebookEventsImporterService()
+    second = service.FacebookEventsImporterService()
+
+    assert first.start_import()
+    assert not second.start_import()
+    first.thread.join()
+
+    status = first.progress.get()
+    assert status["status"] == "finished"
+    assert status["pages_fetched"] == 2
+    assert status["events_created"] == Event.objects.count() > 0
+    # Every generated event has a cover of its own.
+    assert status["images_downloaded"] == status["events_created"]
+    assert second.start_import()
+    second.thread.join()
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_scheduled_runs_leave_the_admin_progress_alone():
+    importer_service = service.FacebookEventsImporterService()
+    assert importer_service.start_import()
+    importer_service.thread.join()
+    status = importer_service.progress.get()
+
+    importer_service.import_pages(force=True)
+
+    assert status["pages_fetched"] == 2
+    assert importer_service.progress.get() == status
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_import_pages_tags_events_and_follows_the_schedule(monkeypatch):
+    fake = FakeGraphTransport()
+
+    def handle(request):
+        # Give every page its own event ids.
+        response = fake.handle(request)
+        if not request.url.path.endswith("/events"):
+            return response
+        page_id = request.url.path.split("/")[-2]
+        body = response.json()
+        for event in body["data"]:
+            event["id"] = f"{page_id}{event['id']}"
+        return httpx.Response(200, json=body)
+
+    transport = httpx.MockTransport(handle)
+    monkeypatch.setattr(
+        service,
+        "get_importer",
+        lambda **kwargs: FacebookEventsImporterSync(
+            http=HTTPClientPool(transport=transport), **kwargs
+        ),
+    )
+    registry = PageRegistry(
+        [
+            {"page_id": "100", "access_token": "token-a"},
+            {"page_id": "200", "access_token": "token-b", "interval": 0},
+        ]
+    )
+    importer_service = service.FacebookEventsImporterService(
+        registry=registry, max_concurrency=2
+    )
+
+    results = importer_service.import_pages()
+
+    assert set(results) == {"100", "200"}
+    assert Event.objects.filter(source_page_id="100").count() == 25
+    assert Event.objects.filter(source_page_id="200").count() == 25
+    tokens = {
+        request.url.params["access_token"]
+        for request in fake.requests
+        if request.url.path.endswith("/events")
+    }
+    assert tokens == {"token-a", "token-b"}
+    # Page 100 waits for its interval; page 200 is due on every run.
+    assert set(importer_service.import_pages()) == {"200"}
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_background_import_waits_for_celery_workers(monkeypatch):
+    celery = pytest.importorskip("celery")
+    from wagtail_facebook_events.importers import celery as celery_importer
+
+    transport = FakeGraphTransport(pages=2)
+    monkeypatch.setattr(
+        celery_importer, "HTTPClientPool", lambda: HTTPClientPool(transport=transport)
+    )
+    monkeypatch.setattr(celery.current_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(
+        service,
+        "get_importer",
+        lambda **kwargs: celery_importer.CeleryFacebookEventsImporter(
+            full_sync=True,
+            page_size=10,
+            http=HTTPClientPool(transport=transport),
+            **kwargs,
+        ),
+    )
+    importer_service = service.FacebookEventsImporterService()
+
+    assert importer_service.start_import()
+    importer_service.thread.join()
+
+    status = importer_service.progress.get()
+    assert status["status"] == "finished"
+    assert status["events_created"] == Event.objects.count() == 20
+    assert status["pages_fetched"] == 2
+    # Scheduled runs return the chord id, which a result backend can store.
+    assert all(
+        isinstance(result, str)
+        for result in importer_service.import_pages(force=True).values()
+    )
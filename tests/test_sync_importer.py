@@ -0,0 +1,115 @@
+import httpx
+import pytest
+
+from wagtail_facebook_events import get_event_model
+from wagtail_facebook_events.api_clients.fake import (
+    FakeGraphTransport,
+    generate_fake_events_data,
+)
+from wagtail_facebook_events.fingerprint import fingerprint, legacy_fingerprint
+from wagtail_facebook_events.http import HTTPClientPool
+from wagtail_facebook_events.importers.sync import FacebookEventsImporterSync
+
+Event = get_event_model()
+
+
+@pytest.mark.django_db
+def test_sharded_sync_fetches_windows_in_threads_and_deduplicates():
+    transport = FakeGraphTransport(pages=3)
+    importer = FacebookEventsImporterSync(
+        full_sync=True, shards=4, http=HTTPClientPool(transport=transport)
+    )
+    importer.events_api.page_size = None
+
+    imported_ids = importer.import_events()
+
+    assert sorted(imported_ids, key=int) == [str(i) for i in range(1, 76)]
+    assert Event.objects.count() == 75
+    listings = [
+        request
+        for request in transport.requests
+        if request.url.path.endswith("/events")
+    ]
+    assert len(listings) == 12
+
+
+@pytest.mark.django_db
+def test_flushes_follow_the_queue_threshold_and_writes_the_db_batch_size():
+    importer = FacebookEventsImporterSync(
+        full_sync=True,
+        flush_batch_size=50,
+        db_batch_size=10,
+        http=HTTPClientPool(transport=FakeGraphTransport(pages=4)),
+    )
+    importer.events_api.page_size = None
+    queued, writes = [], []
+    add_page = importer._add_page
+    bulk_create = importer.processor.bulk_create
+
+    def record_queue(*args, **kwargs):
+        should_flush = add_page(*args, **kwargs)
+        queued.append(len(importer._create_events))
+        return should_flush
+
+    def record_write(create_events, batch_size=None):
+        writes.append((len(create_events), batch_size))
+        return bulk_create(create_events, batch_size=batch_size)
+
+    importer._add_page = record_queue
+    importer.processor.bulk_create = record_write
+    importer.import_events()
+
+    # Four pages of 25 events: a flush after every second page, and never
+    # more than the threshold queued in memory.
+    assert queued == [25, 50, 25, 50]
+    assert writes == [(50, 10), (50, 10)]
+    assert Event.objects.count() == 100
+
+
+@pytest.mark.django_db
+def test_legacy_fingerprints_are_upgraded_when_the_page_is_flushed():
+    transport = FakeGraphTransport()
+    FacebookEventsImporterSync(http=HTTPClientPool(transport=transport)).import_events()
+    events = transport.generator.events()[:25]
+    for event in events:
+        Event.objects.filter(facebook_id=event["id"]).update(
+            hashed=legacy_fingerprint(event)
+        )
+
+    importer = FacebookEventsImporterSync(http=HTTPClientPool(transport=transport))
+    assert importer.import_events() == []
+
+    assert dict(Event.objects.values_list("facebook_id", "hashed")) == {
+        event["id"]: fingerprint(event) for event in events
+    }
+
+
+@pytest.mark.django_db
+def test_legacy_fingerprints_match_events_fetched_with_the_default_fields():
+    # Graph returns an unprojected place in its own key order.
+    place = {
+        "name": "Venue",
+        "location": {"city": "Utrecht", "country": "Netherlands", "zip": "3511"},
+        "id": "7",
+    }
+    event = dict(generate_fake_events_data(1)[0], place=place)
+    event.pop("cover")
+
+    def handle(request):
+        fields = request.url.params["fields"].split(",")
+        if "place" not in fields:
+            # A projection such as place{id,name,...} reorders the keys.
+            projected = dict(event, place=dict(sorted(place.items())))
+            return httpx.Response(200, json={"data": [projected]})
+        return httpx.Response(200, json={"data": [event]})
+
+    transport = httpx.MockTransport(handle)
+    FacebookEventsImporterSync(http=HTTPClientPool(transport=transport)).import_events()
+    Event.objects.update(name="Edited locally", hashed=legacy_fingerprint(event))
+
+    FacebookEventsImporterSync(http=HTTPClientPool(transport=transport)).import_events()
+
+    stored = Event.objects.get()
+    assert stored.hashed == fingerprint(event)
+    # Only the fingerprint was rewritten; the event itself was not updated.
+    assert stored.name == "Edited locally"
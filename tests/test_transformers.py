@@ -0,0 +1,83 @@
+import asyncio
+import copy
+
+import pytest
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+
+from wagtail_facebook_events import get_event_model, get_event_serializer
+from wagtail_facebook_events.api_clients.fake import generate_fake_events_data
+from wagtail_facebook_events.processors.asynchronous import AsyncEventsProcessor
+from wagtail_facebook_events.processors.sync import EventsProcessor
+from wagtail_facebook_events.transformers import EventTransformer
+
+Event = get_event_model()
+EventSerializer = get_event_serializer()
+ImageModel = get_image_model()
+
+
+def test_transformer_matches_the_serializer():
+    events = generate_fake_events_data(5)
+    for event in events:
+        event.pop("cover")
+        event["hashed"] = "0" * 32
+
+    rows, errors = EventTransformer(Event).transform_many(copy.deepcopy(events))
+
+    assert errors == {}
+    for index, event in enumerate(events):
+        serializer = EventSerializer(data=event)
+        assert serializer.is_valid(), serializer.errors
+        assert rows[index] == dict(serializer.validated_data)
+
+
+def test_transformer_reports_invalid_events_by_position():
+    events = generate_fake_events_data(3)
+    for event in events:
+        event.pop("cover")
+    events[1]["start_time"] = "not a time"
+
+    rows, errors = EventTransformer(Event).transform_many(events)
+
+    assert set(rows) == {0, 2}
+    assert set(errors) == {1}
+    assert "start_time" in errors[1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("transform_mode", ["fast", "strict"])
+def test_bulk_create_in_both_transform_modes(transform_mode):
+    processor = EventsProcessor(transform_mode=transform_mode)
+    events = generate_fake_events_data(3)
+    for index, event in enumerate(events):
+        event["id"] = str(index)
+        event.pop("cover")
+    create_events, _, _ = processor._partition_page(events)
+    processor.bulk_create(create_events)
+
+    assert Event.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_async_writes_in_strict_mode_resolve_images_off_the_event_loop():
+    image = ImageModel.objects.create(title="Cover", file=get_test_image_file())
+    processor = AsyncEventsProcessor(transform_mode="strict")
+    events = generate_fake_events_data(3)
+    for index, event in enumerate(events):
+        event["id"] = str(index)
+        event["image"] = image.pk
+        event.pop("cover")
+
+    async def write():
+        create_events, _, _ = await processor.apartition_page(events[:2])
+        await processor.abulk_create(create_events)
+        events[0]["name"] += " (updated)"
+        _, update_events, _ = await processor.apartition_page(events[:1])
+        await processor.abulk_update(update_events)
+        await processor.aupsert(events[1:])
+
+    asyncio.run(write())
+
+    assert Event.objects.count() == 3
+    assert set(Event.objects.values_list("image", flat=True)) == {image.pk}
+    assert Event.objects.get(facebook_id="0").name == events[0]["name"]
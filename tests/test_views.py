@@ -0,0 +1,79 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from wagtail_facebook_events.progress import ImportProgress
+from wagtail_facebook_events.service import FacebookEventsImporterService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def started(monkeypatch):
+    calls = []
+
+    def start_import(service):
+        calls.append(service)
+        return service.progress.acquire()
+
+    monkeypatch.setattr(FacebookEventsImporterService, "start_import", start_import)
+    return calls
+
+
+@pytest.mark.django_db
+def test_import_page_only_shows_the_status(admin_client, started):
+    response = admin_client.get(reverse("import_events"))
+
+    assert response.status_code == 200
+    assert started == []
+    content = response.content.decode()
+    assert f'action="{reverse("import_events")}"' in content
+    assert f'data-status-url="{reverse("import_events_status")}"' in content
+    assert "csrfmiddlewaretoken" in content
+
+
+@pytest.mark.django_db
+def test_menu_item_opens_the_import_page(admin_client):
+    response = admin_client.get(reverse("wagtailadmin_home"))
+
+    assert f'"url": "{reverse("import_events")}"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_posting_starts_one_import(admin_client, started):
+    first = admin_client.post(reverse("import_events"))
+    second = admin_client.post(reverse("import_events"))
+
+    assert first.status_code == 202
+    assert first.json()["started"] is True
+    assert second.status_code == 409
+    assert second.json()["started"] is False
+    assert len(started) == 2
+
+
+@pytest.mark.django_db
+def test_starting_an_import_requires_the_csrf_token(admin_user, started):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(admin_user)
+
+    response = client.post(reverse("import_events"))
+
+    assert response.status_code == 403
+    assert started == []
+
+
+@pytest.mark.django_db
+def test_status_reports_the_progress(admin_client):
+    progress = ImportProgress()
+    progress.start()
+    progress.add(events_created=3)
+
+    response = admin_client.get(reverse("import_events_status"))
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    assert response.json()["events_created"] == 3
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class TestAppConfig(AppConfig):
+    name = "testapp"
+    # FacebookEvent.image points at cms.CustomImage.
+    label = "cms"
@@ -0,0 +1,33 @@
+from django.db import models
+from wagtail.images.models import AbstractImage, AbstractRendition, Image
+
+from wagtail_facebook_events.models import (
+    FacebookDeadLetter,
+    FacebookEvent,
+    FacebookSyncCursor,
+)
+
+
+class CustomImage(AbstractImage):
+    admin_form_fields = Image.admin_form_fields
+
+
+class CustomRendition(AbstractRendition):
+    image = models.ForeignKey(
+        CustomImage, on_delete=models.CASCADE, related_name="renditions"
+    )
+
+    class Meta:
+        unique_together = (("image", "filter_spec", "focal_point_key"),)
+
+
+class Event(FacebookEvent):
+    pass
+
+
+class SyncCursor(FacebookSyncCursor):
+    pass
+
+
+class DeadLetter(FacebookDeadLetter):
+    pass
@@ -0,0 +1,74 @@
+"""Django settings for the test suite; see ``[tool:pytest]`` in setup.cfg."""
+
+import os
+import tempfile
+
+SECRET_KEY = "test"
+USE_TZ = True
+DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+
+INSTALLED_APPS = [
+    "django.contrib.contenttypes",
+    "django.contrib.auth",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "taggit",
+    "wagtail",
+    "wagtail.documents",
+    "wagtail.images",
+    "wagtail.snippets",
+    "wagtail.sites",
+    "wagtail.admin",
+    "wagtail.users",
+    "rest_framework",
+    "wagtail_facebook_events",
+    "testapp.apps.TestAppConfig",
+]
+
+MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ]
+        },
+    }
+]
+
+# Importers run in threads and event loops, which need a database file that
+# every connection shares rather than a per-connection in-memory database.
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(tempfile.gettempdir(), "wagtail_facebook_events.sqlite3"),
+        "TEST": {
+            "NAME": os.path.join(
+                tempfile.gettempdir(), "test_wagtail_facebook_events.sqlite3"
+            )
+        },
+    }
+}
+
+ROOT_URLCONF = "testapp.urls"
+STATIC_URL = "/static/"
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), "wagtail_facebook_events_media")
+WAGTAIL_SITE_NAME = "Tests"
+WAGTAILADMIN_BASE_URL = "http://testserver"
+WAGTAILIMAGES_IMAGE_MODEL = "cms.CustomImage"
+
+WAGTAIL_FACEBOOK_EVENTS_EVENT_MODEL = "testapp.models.Event"
+WAGTAIL_FACEBOOK_EVENTS_SYNC_CURSOR_MODEL = "testapp.models.SyncCursor"
+WAGTAIL_FACEBOOK_EVENTS_DEAD_LETTER_MODEL = "testapp.models.DeadLetter"